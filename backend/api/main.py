@@ -8,6 +8,9 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 import logging
 
+from etl.vector_service import get_vector_service
+from services.github_dispatcher import close_github_dispatcher
+from services.watchdog.version_checker import close_version_checker
 from api.routes import drugs, search, chat, analytics, compare, reports, version_check, watchdog
 
 # Configure logging
@@ -57,6 +60,21 @@ app.include_router(watchdog.router, prefix="/api/watchdog", tags=["Watchdog Auto
 app.include_router(watchdog.router, prefix="/api/watchdog", tags=["Watchdog Automation"])
 
 
+# Load the shared embedding model before serving traffic so the first
+# search/chat request doesn't pay for model load and warm-up
+@app.on_event("startup")
+def warm_up_vector_service():
+    get_vector_service().warmup()
+
+
+# Close the shared outbound HTTP clients (DailyMed, GitHub) that routes
+# reuse across requests
+@app.on_event("shutdown")
+async def close_http_clients():
+    await close_version_checker()
+    await close_github_dispatcher()
+
+
 # Health check endpoint
 @app.get("/", tags=["Health"])
 async def root():
@@ -105,11 +123,23 @@ async def global_exception_handler(request, exc):
 
 
 if __name__ == "__main__":
+    import os
+    import sys
     import uvicorn
+    
+    # Auto-reload is for development; set API_RELOAD=false to serve with
+    # API_WORKERS processes instead (the two can't be combined)
+    reload = os.getenv("API_RELOAD", "true").lower() == "true"
+    
     uvicorn.run(
         "backend.api.main:app",
         host="0.0.0.0",
         port=8000,
-        reload=True,
+        reload=reload,
+        workers=None if reload else int(os.getenv("API_WORKERS", "4")),
+        # uvloop and httptools ship with uvicorn[standard]; uvloop has no
+        # Windows build, so fall back to uvicorn's default selection there
+        loop="auto" if sys.platform == "win32" else "uvloop",
+        http="httptools",
         log_level="info"
     )
@@ -0,0 +1,61 @@
+"""
+Response Cache
+In-process TTL cache for read-heavy GET endpoints whose data only changes
+when the watchdog records a new label version
+"""
+
+import functools
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+# Per-route TTL policies, in seconds
+SHORT_TTL = 30.0
+NORMAL_TTL = 60.0
+LONG_TTL = 300.0
+
+MAX_ENTRIES_PER_NAMESPACE = 256
+
+_caches: Dict[str, OrderedDict] = {}
+
+
+def cached(namespace: str, ttl: float = NORMAL_TTL):
+    """
+    Cache an async route handler's result keyed by its arguments
+
+    Only successful results are cached; raised HTTPExceptions pass through.
+    The wrapper keeps the handler's signature, so FastAPI still sees its
+    query and path parameters
+    """
+    def decorator(func):
+        cache = _caches.setdefault(namespace, OrderedDict())
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+
+            entry = cache.get(key)
+            if entry and entry[0] > now:
+                cache.move_to_end(key)
+                return entry[1]
+
+            result = await func(*args, **kwargs)
+
+            cache[key] = (now + ttl, result)
+            cache.move_to_end(key)
+            if len(cache) > MAX_ENTRIES_PER_NAMESPACE:
+                cache.popitem(last=False)
+            return result
+
+        return wrapper
+    return decorator
+
+
+def clear(namespace: Optional[str] = None):
+    """Drop cached responses for one namespace, or all of them"""
+    if namespace is None:
+        for cache in _caches.values():
+            cache.clear()
+    elif namespace in _caches:
+        _caches[namespace].clear()
@@ -15,6 +15,7 @@ from api.schemas import (
     ComparisonResponse,
     DrugComparison
 )
+from api import response_cache
 from models.db_session import AsyncSessionLocal
 from models.database import DrugLabel, DrugSection
 
@@ -27,6 +28,7 @@ router = APIRouter()
     summary="Get platform statistics",
     description="Get overall platform statistics and insights"
 )
+@response_cache.cached("analytics", ttl=response_cache.LONG_TTL)
 async def get_platform_analytics():
     """
     Get platform-wide statistics
@@ -39,32 +41,25 @@ async def get_platform_analytics():
     """
     async with AsyncSessionLocal() as session:
         try:
-            # Total current drugs (active labels)
-            drug_count_result = await session.execute(
-                text("SELECT COUNT(*) as count FROM drug_labels WHERE is_current_version = true")
-            )
-            total_drugs = drug_count_result.scalar()
-            active_labels = total_drugs  # Same as total_drugs
-            
-            # Total unique manufacturers
-            manufacturer_count_result = await session.execute(
+            # Headline counts in one pass over the current labels
+            # instead of a round trip per aggregate
+            totals_result = await session.execute(
                 text("""
-                    SELECT COUNT(DISTINCT manufacturer) as count
+                    SELECT
+                        COUNT(*) as total_drugs,
+                        COUNT(DISTINCT manufacturer) as total_manufacturers,
+                        COUNT(DISTINCT generic_name) as total_drug_types,
+                        MAX(last_updated) as last_update
                     FROM drug_labels
                     WHERE is_current_version = true
                 """)
             )
-            total_manufacturers = manufacturer_count_result.scalar()
-            
-            # Total unique drug types (generic names)
-            drug_type_count_result = await session.execute(
-                text("""
-                    SELECT COUNT(DISTINCT generic_name) as count
-                    FROM drug_labels
-                    WHERE is_current_version = true AND generic_name IS NOT NULL
-                """)
-            )
-            total_drug_types = drug_type_count_result.scalar()
+            totals = totals_result.one()
+            total_drugs = totals.total_drugs
+            active_labels = total_drugs  # Same as total_drugs
+            total_manufacturers = totals.total_manufacturers
+            total_drug_types = totals.total_drug_types  # COUNT(DISTINCT) skips NULLs
+            last_updated = totals.last_update
             
             # Manufacturers breakdown (top 10)
             manufacturer_result = await session.execute(
@@ -92,16 +87,6 @@ async def get_platform_analytics():
             )
             drug_types = [{"name": row.generic_name, "count": row.count} for row in drug_type_result.fetchall()]
             
-            # Get latest updated date
-            updated_result = await session.execute(
-                text("""
-                    SELECT MAX(last_updated) as last_update
-                    FROM drug_labels
-                    WHERE is_current_version = true
-                """)
-            )
-            last_updated = updated_result.scalar()
-            
             return PlatformAnalytics(
                 total_drugs=total_drugs,
                 total_manufacturers=total_manufacturers,
@@ -125,6 +110,7 @@ async def get_platform_analytics():
     summary="Get drug analytics",
     description="Get detailed analytics for a specific drug"
 )
+@response_cache.cached("analytics")
 async def get_drug_analytics(drug_id: int):
     """
     Get analytics for a specific drug
@@ -11,13 +11,10 @@ from groq import Groq
 
 from api.schemas import ChatRequest, ChatResponse, Citation
 from models.db_session import AsyncSessionLocal
-from etl.vector_service import VectorService
+from etl.vector_service import get_vector_service
 
 router = APIRouter()
 
-# Initialize vector service
-vector_service = VectorService()
-
 # Initialize Groq client
 groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
 # Using llama-3.3-70b-versatile (newer model replacing llama-3.1-70b-versatile)
@@ -237,7 +234,7 @@ async def chat_ask(request: ChatRequest):
     async with AsyncSessionLocal() as session:
         try:
             # Generate embedding for the question
-            query_embedding = vector_service.generate_embedding(request.message)
+            query_embedding = get_vector_service().generate_embedding(request.message)
             query_vector = str(query_embedding.tolist())
             
             # Build retrieval query
@@ -367,7 +364,7 @@ async def chat_compare(request: ChatRequest):
     async with AsyncSessionLocal() as session:
         try:
             # Generate embedding
-            query_embedding = vector_service.generate_embedding(request.message)
+            query_embedding = get_vector_service().generate_embedding(request.message)
             query_vector = str(query_embedding.tolist())
             
             # Retrieve from multiple drugs
@@ -356,44 +356,35 @@ async def compare_semantic(request: SemanticDiffRequest):
                 matched_competitor = set()
                 
                 # ⭐ FIX 3: Bidirectional matching to prevent "same claim twice" issue
+                # Cosine similarity for every (source, competitor) pair in one
+                # matmul; stored embeddings are unit vectors, so no norm division
+                source_matrix = np.vstack(source_embeddings)
+                competitor_matrix = np.vstack(competitor_embeddings)
+                similarity_matrix = source_matrix @ competitor_matrix.T
+                
+                # Only positive scores at or above the threshold can be matches;
+                # argmax picks the first best candidate, like a strict > scan
+                candidate_scores = np.where(
+                    (similarity_matrix > 0.0) & (similarity_matrix >= request.similarity_threshold),
+                    similarity_matrix,
+                    -np.inf
+                )
+                
                 # Step 1: Find best match from source → competitor
                 source_to_comp_matches = {}  # {source_idx: (comp_idx, score)}
                 
-                for i, src_emb in enumerate(source_embeddings):
-                    best_match_idx = None
-                    best_score = 0.0
-                    
-                    for j, comp_emb in enumerate(competitor_embeddings):
-                        # Cosine similarity
-                        similarity = float(src_emb @ comp_emb / (
-                            (src_emb @ src_emb) ** 0.5 * (comp_emb @ comp_emb) ** 0.5
-                        ))
-                        
-                        if similarity > best_score and similarity >= request.similarity_threshold:
-                            best_score = similarity
-                            best_match_idx = j
-                    
-                    if best_match_idx is not None:
-                        source_to_comp_matches[i] = (best_match_idx, best_score)
+                best_comp = candidate_scores.argmax(axis=1)
+                best_comp_scores = candidate_scores[np.arange(len(best_comp)), best_comp]
+                for i in np.flatnonzero(np.isfinite(best_comp_scores)):
+                    source_to_comp_matches[int(i)] = (int(best_comp[i]), float(best_comp_scores[i]))
                 
                 # Step 2: Find best match from competitor → source (reverse direction)
                 comp_to_source_matches = {}  # {comp_idx: (source_idx, score)}
                 
-                for j, comp_emb in enumerate(competitor_embeddings):
-                    best_match_idx = None
-                    best_score = 0.0
-                    
-                    for i, src_emb in enumerate(source_embeddings):
-                        similarity = float(src_emb @ comp_emb / (
-                            (src_emb @ src_emb) ** 0.5 * (comp_emb @ comp_emb) ** 0.5
-                        ))
-                        
-                        if similarity > best_score and similarity >= request.similarity_threshold:
-                            best_score = similarity
-                            best_match_idx = i
-                    
-                    if best_match_idx is not None:
-                        comp_to_source_matches[j] = (best_match_idx, best_score)
+                best_source = candidate_scores.argmax(axis=0)
+                best_source_scores = candidate_scores[best_source, np.arange(len(best_source))]
+                for j in np.flatnonzero(np.isfinite(best_source_scores)):
+                    comp_to_source_matches[int(j)] = (int(best_source[j]), float(best_source_scores[j]))
                 
                 # Step 3: Only accept bidirectional matches (both directions agree)
                 for i, (comp_idx, score) in source_to_comp_matches.items():
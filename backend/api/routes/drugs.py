@@ -16,6 +16,7 @@ from api.schemas import (
 )
 from models.database import DrugLabel, DrugSection as DBDrugSection
 from models.db_session import AsyncSessionLocal
+from api import response_cache
 
 router = APIRouter()
 
@@ -26,6 +27,7 @@ router = APIRouter()
     summary="Get all drugs",
     description="Retrieve a paginated list of all drug labels in the database"
 )
+@response_cache.cached("drugs")
 async def get_all_drugs(
     skip: int = Query(default=0, ge=0, description="Number of records to skip"),
     limit: int = Query(default=20, ge=1, le=100, description="Maximum number of records to return"),
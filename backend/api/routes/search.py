@@ -9,13 +9,10 @@ import time
 
 from api.schemas import SearchQuery, DashboardSearchResponse, DrugSimilarityResult
 from models.db_session import AsyncSessionLocal
-from etl.vector_service import VectorService
+from etl.vector_service import get_vector_service
 
 router = APIRouter()
 
-# Initialize vector service for generating query embeddings
-vector_service = VectorService()
-
 
 @router.post(
     "/dashboard",
@@ -56,7 +53,7 @@ async def dashboard_semantic_search(query_data: SearchQuery):
     async with AsyncSessionLocal() as session:
         try:
             # Generate embedding for the user's semantic query
-            query_embedding = vector_service.generate_embedding(query_data.query)
+            query_embedding = get_vector_service().generate_embedding(query_data.query)
             
             # Convert numpy array to string format for pgvector
             query_vector = str(query_embedding.tolist())
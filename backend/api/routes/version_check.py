@@ -10,7 +10,43 @@ from datetime import datetime
 
 from api.schemas import VersionCheckResult, VersionHistory
 from models.db_session import AsyncSessionLocal
-from services.watchdog.version_checker import VersionChecker
+from services.watchdog.version_checker import get_version_checker
+
+# Statements are built once at import rather than on every request
+_GET_DRUG = text("""
+    SELECT id, set_id, name, version
+    FROM drug_labels
+    WHERE id = :drug_id
+""")
+
+_GET_DRUGS_BY_IDS = text("""
+    SELECT id, set_id, name, version
+    FROM drug_labels
+    WHERE id = ANY(:drug_ids)
+""")
+
+_GET_ENABLED_DRUGS = text("""
+    SELECT id, set_id, name, version
+    FROM drug_labels
+    WHERE version_check_enabled = true
+""")
+
+_GET_VERSION_HISTORY = text("""
+    SELECT 
+        vh.id,
+        vh.drug_id,
+        dl.name as drug_name,
+        vh.old_version,
+        vh.new_version,
+        vh.changes_detected,
+        vh.checked_at,
+        vh.updated_at
+    FROM version_history vh
+    JOIN drug_labels dl ON vh.drug_id = dl.id
+    WHERE vh.drug_id = :drug_id
+    ORDER BY vh.checked_at DESC
+    LIMIT 50
+""")
 
 router = APIRouter()
 
@@ -23,23 +59,20 @@ async def trigger_version_check(drug_id: int):
     async with AsyncSessionLocal() as session:
         try:
             # Get drug info
-            query = text("""
-                SELECT id, set_id, name, version
-                FROM drug_labels
-                WHERE id = :drug_id
-            """)
-            result = await session.execute(query, {"drug_id": drug_id})
+            result = await session.execute(_GET_DRUG, {"drug_id": drug_id})
             drug = result.fetchone()
             
             if not drug:
                 raise HTTPException(status_code=404, detail="Drug not found")
             
             # Check version
-            checker = VersionChecker()
+            # User-initiated, so only reuse a very recent cached history
+            checker = get_version_checker()
             result = await checker.check_version(
                 session,
                 set_id=drug.set_id,
-                current_version=drug.version
+                current_version=drug.version,
+                cache_policy='short'
             )
             
             # Return result
@@ -72,57 +105,44 @@ async def check_versions(drug_ids: Optional[List[int]] = None):
         try:
             # Get drugs to check
             if drug_ids:
-                query = text("""
-                    SELECT id, set_id, name, version
-                    FROM drug_labels
-                    WHERE id = ANY(:drug_ids)
-                """)
-                result = await session.execute(query, {"drug_ids": drug_ids})
+                result = await session.execute(_GET_DRUGS_BY_IDS, {"drug_ids": drug_ids})
             else:
-                query = text("""
-                    SELECT id, set_id, name, version
-                    FROM drug_labels
-                    WHERE version_check_enabled = true
-                """)
-                result = await session.execute(query)
+                result = await session.execute(_GET_ENABLED_DRUGS)
             
             drugs = result.fetchall()
             
             if not drugs:
                 return []
             
-            # Check each drug
-            checker = VersionChecker()
-            results = []
+            # Check all drugs concurrently over the shared client
+            checker = get_version_checker()
+            check_results = await checker.check_versions_bulk([
+                {
+                    'drug_id': drug.id,
+                    'set_id': drug.set_id,
+                    'current_version': drug.version,
+                    'drug_name': drug.name
+                }
+                for drug in drugs
+            ])
             
-            for drug in drugs:
-                try:
-                    check_result = await checker.check_version(
-                        session,
-                        set_id=drug.set_id,
-                        current_version=drug.version
-                    )
-                    
-                    results.append(VersionCheckResult(
-                        drug_id=drug.id,
-                        drug_name=drug.name,
-                        current_version=drug.version,
-                        new_version=check_result.get("new_version"),
-                        has_update=check_result.get("has_update", False),
-                        changes=check_result.get("changes"),
-                        checked_at=datetime.now()
-                    ))
-                except Exception as e:
-                    print(f"Error checking {drug.name}: {e}")
-                    results.append(VersionCheckResult(
-                        drug_id=drug.id,
-                        drug_name=drug.name,
-                        current_version=drug.version,
-                        new_version=None,
-                        has_update=False,
-                        changes=f"Error: {str(e)}",
-                        checked_at=datetime.now()
-                    ))
+            results = []
+            for drug, check_result in zip(drugs, check_results):
+                if check_result['status'] == 'error':
+                    print(f"Error checking {drug.name}: {check_result.get('error')}")
+                    changes = f"Error: {check_result.get('error')}"
+                else:
+                    changes = check_result.get("changes")
+                
+                results.append(VersionCheckResult(
+                    drug_id=drug.id,
+                    drug_name=drug.name,
+                    current_version=drug.version,
+                    new_version=check_result.get("new_version"),
+                    has_update=check_result['status'] == 'new_version',
+                    changes=changes,
+                    checked_at=datetime.now()
+                ))
             
             return results
             
@@ -140,24 +160,7 @@ async def get_version_history(drug_id: int):
     """
     async with AsyncSessionLocal() as session:
         try:
-            query = text("""
-                SELECT 
-                    vh.id,
-                    vh.drug_id,
-                    dl.name as drug_name,
-                    vh.old_version,
-                    vh.new_version,
-                    vh.changes_detected,
-                    vh.checked_at,
-                    vh.updated_at
-                FROM version_history vh
-                JOIN drug_labels dl ON vh.drug_id = dl.id
-                WHERE vh.drug_id = :drug_id
-                ORDER BY vh.checked_at DESC
-                LIMIT 50
-            """)
-            
-            result = await session.execute(query, {"drug_id": drug_id})
+            result = await session.execute(_GET_VERSION_HISTORY, {"drug_id": drug_id})
             history = result.fetchall()
             
             return [
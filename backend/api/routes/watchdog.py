@@ -4,15 +4,31 @@ Real-time manual triggering of version check automation via GitHub Actions
 """
 
 from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect
+from sqlalchemy import text
 from typing import List, Optional
 import asyncio
 import json
 from datetime import datetime
 
+from api import response_cache
 from models.db_session import AsyncSessionLocal
-from services.watchdog.version_checker import VersionChecker
+from services.watchdog.version_checker import get_version_checker
 from services.watchdog.s3_uploader import S3Uploader
-from services.github_dispatcher import GitHubDispatcher
+from services.github_dispatcher import get_github_dispatcher
+
+# Statements are built once at import rather than on every request; the
+# ANY(array) form keeps the ID lookup a single statement for any list size
+_GET_DRUGS_BY_IDS = text("""
+    SELECT id, set_id, name, version
+    FROM drug_labels
+    WHERE id = ANY(:drug_ids)
+""")
+
+_GET_DRUG = text("""
+    SELECT id, set_id, name, version
+    FROM drug_labels
+    WHERE id = :drug_id
+""")
 
 router = APIRouter()
 
@@ -25,7 +41,7 @@ class WatchdogPipeline:
     
     def __init__(self, websocket: Optional[WebSocket] = None):
         self.websocket = websocket
-        self.version_checker = VersionChecker()
+        self.version_checker = get_version_checker()
         self.s3_uploader = S3Uploader()
     
     async def send_progress(self, drug_id: int, status: str, message: str, 
@@ -116,6 +132,9 @@ class WatchdogPipeline:
                 )
                 await session.commit()
             
+            # Drug listings and analytics now show the new version
+            response_cache.clear()
+            
             # Complete (100%)
             await self.send_progress(
                 drug_id, "completed", 
@@ -172,17 +191,7 @@ async def websocket_endpoint(websocket: WebSocket):
 async def process_drugs_background(drug_ids: List[int]):
     """Process drugs in the background and send updates via WebSocket"""
     async with AsyncSessionLocal() as session:
-        from sqlalchemy import text
-        
-        placeholders = ','.join([f':id{i}' for i in range(len(drug_ids))])
-        query = text(f"""
-            SELECT id, set_id, name, version
-            FROM drug_labels
-            WHERE id IN ({placeholders})
-        """)
-        
-        params = {f'id{i}': drug_id for i, drug_id in enumerate(drug_ids)}
-        result = await session.execute(query, params)
+        result = await session.execute(_GET_DRUGS_BY_IDS, {"drug_ids": drug_ids})
         drugs = result.fetchall()
     
     # Process each drug
@@ -210,24 +219,14 @@ async def trigger_manual_watchdog(drug_ids: List[int]):
     
     # Get drug details
     async with AsyncSessionLocal() as session:
-        from sqlalchemy import text
-        
-        placeholders = ','.join([f':id{i}' for i in range(len(drug_ids))])
-        query = text(f"""
-            SELECT id, set_id, name, version
-            FROM drug_labels
-            WHERE id IN ({placeholders})
-        """)
-        
-        params = {f'id{i}': drug_id for i, drug_id in enumerate(drug_ids)}
-        result = await session.execute(query, params)
+        result = await session.execute(_GET_DRUGS_BY_IDS, {"drug_ids": drug_ids})
         drugs = result.fetchall()
     
     if not drugs:
         raise HTTPException(status_code=404, detail="No drugs found")
     
     # Trigger GitHub Actions workflow for each drug
-    dispatcher = GitHubDispatcher()
+    dispatcher = get_github_dispatcher()
     set_ids = [drug.set_id for drug in drugs]
     
     # Trigger workflows
@@ -266,15 +265,7 @@ async def run_watchdog_for_drug(drug_id: int):
     """
     # Get drug details
     async with AsyncSessionLocal() as session:
-        from sqlalchemy import text
-        
-        query = text("""
-            SELECT id, set_id, name, version
-            FROM drug_labels
-            WHERE id = :drug_id
-        """)
-        
-        result = await session.execute(query, {"drug_id": drug_id})
+        result = await session.execute(_GET_DRUG, {"drug_id": drug_id})
         drug = result.fetchone()
     
     if not drug:
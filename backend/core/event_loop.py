@@ -0,0 +1,27 @@
+"""
+Event loop setup for async entry points
+Uses uvloop when it is installed, otherwise keeps the default asyncio loop
+"""
+
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def install_uvloop() -> bool:
+    """
+    Switch asyncio to uvloop's event loop policy
+    Call before asyncio.run(); uvloop is unavailable on Windows
+
+    Returns:
+        True if uvloop was installed
+    """
+    try:
+        import uvloop
+    except ImportError:
+        logger.debug("uvloop not installed, using the default asyncio event loop")
+        return False
+
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
@@ -0,0 +1,59 @@
+"""
+On-disk cache for text embeddings
+Stores one .npy file per text, keyed by the SHA-256 of the model name and text
+"""
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingDiskCache:
+    """
+    Persistent embedding cache so repeated runs skip the model forward pass
+    Enable by setting EMBEDDING_CACHE_DIR; entries are never evicted
+    """
+
+    def __init__(self, cache_dir: Path, model_name: str):
+        self.cache_dir = Path(cache_dir)
+        self.model_name = model_name
+
+    @classmethod
+    def from_env(cls, model_name: str) -> Optional['EmbeddingDiskCache']:
+        """Build a cache from EMBEDDING_CACHE_DIR, or None if it is unset"""
+        cache_dir = os.getenv('EMBEDDING_CACHE_DIR')
+        return cls(Path(cache_dir), model_name) if cache_dir else None
+
+    def _path(self, text: str) -> Path:
+        # Include the model name so switching models never returns stale vectors
+        digest = hashlib.sha256(f"{self.model_name}\0{text}".encode('utf-8')).hexdigest()
+        return self.cache_dir / f"{digest}.npy"
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        """Return the cached embedding for text, or None on a miss"""
+        path = self._path(text)
+        if not path.exists():
+            return None
+        try:
+            return np.load(path, mmap_mode='r')
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable embedding cache entry {path}: {e}")
+            return None
+
+    def put(self, text: str, embedding: np.ndarray):
+        """Persist an embedding; failures are logged and otherwise ignored"""
+        path = self._path(text)
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            # np.save appends .npy unless the name already ends with it
+            tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+            np.save(tmp_path, np.asarray(embedding, dtype=np.float32))
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Failed to write embedding cache entry {path}: {e}")
@@ -0,0 +1,84 @@
+"""
+On-disk cache for parsed FDA labels
+Memoizes parser output keyed by the SHA-256 of the source ZIP file
+"""
+
+import functools
+import hashlib
+import logging
+import os
+import pickle
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Override with PARSER_CACHE_DIR; set it to an empty string to disable caching
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'glp1_parser'
+
+
+def get_cache_dir() -> Optional[Path]:
+    """Resolve the cache directory, or None if caching is disabled"""
+    cache_dir = os.getenv('PARSER_CACHE_DIR')
+    if cache_dir is None:
+        return DEFAULT_CACHE_DIR
+    return Path(cache_dir) if cache_dir else None
+
+
+def file_sha256(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Hash a file in fixed-size chunks without loading it into memory"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def disk_cached(version: int):
+    """
+    Cache a ``parse_zip_file(self, zip_path)`` method's result on disk
+
+    Args:
+        version: Parser output version; bump it whenever the parser's output
+            changes so stale entries are ignored
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(self, zip_path: str, *args, **kwargs):
+            cache_dir = get_cache_dir()
+            if cache_dir is None:
+                return func(self, zip_path, *args, **kwargs)
+
+            try:
+                digest = file_sha256(zip_path)
+            except OSError:
+                # Let the parser report unreadable files its own way
+                return func(self, zip_path, *args, **kwargs)
+
+            cache_key = f"{func.__qualname__}_v{version}_{digest}"
+            cache_file = cache_dir / f"{cache_key}.pkl"
+
+            if cache_file.exists():
+                try:
+                    with open(cache_file, 'rb') as f:
+                        return pickle.load(f)
+                except Exception as e:
+                    logger.warning(f"Ignoring unreadable parser cache entry {cache_file}: {e}")
+
+            result = func(self, zip_path, *args, **kwargs)
+
+            # Failed parses are not cached so they are retried next time
+            if result is not None:
+                try:
+                    cache_dir.mkdir(parents=True, exist_ok=True)
+                    tmp_file = cache_file.with_suffix(f'.{os.getpid()}.tmp')
+                    with open(tmp_file, 'wb') as f:
+                        pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+                    os.replace(tmp_file, cache_file)
+                except Exception as e:
+                    logger.warning(f"Failed to write parser cache entry {cache_file}: {e}")
+
+            return result
+
+        return wrapper
+    return decorator
@@ -6,6 +6,7 @@ Uses LOINC codes to identify specific sections
 
 import zipfile
 import io
+import re
 from lxml import etree
 from typing import Dict, List, Optional, Tuple
 from pathlib import Path
@@ -13,6 +14,8 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+TITLE_DRUG_NAME_RE = re.compile(r'use ([A-Z][A-Z0-9]+)[\s®™]')
+
 
 # LOINC Code Mappings - FDA Standard Section Identifiers
 LOINC_SECTIONS = {
@@ -46,6 +49,9 @@ class FDAXMLParser:
             'hl7': 'urn:hl7-org:v3',
             'xsi': 'http://www.w3.org/2001/XMLSchema-instance'
         }
+        # SPL documents can exceed libxml2's default size limits; skip ID
+        # indexing since we never look elements up by xml:id
+        self.xml_parser = etree.XMLParser(huge_tree=True, collect_ids=False)
     
     def parse_zip_file(self, zip_path: str) -> Optional[Dict]:
         """
@@ -59,18 +65,21 @@ class FDAXMLParser:
         """
         try:
             with zipfile.ZipFile(zip_path, 'r') as zip_file:
-                # Find the XML file inside the zip
-                xml_files = [f for f in zip_file.namelist() if f.endswith('.xml')]
+                # Find the XML file inside the zip (usually only one); the
+                # central directory lets us skip the bundled PDFs and images
+                xml_filename = next(
+                    (f for f in zip_file.namelist() if f.endswith('.xml')), None
+                )
                 
-                if not xml_files:
+                if xml_filename is None:
                     logger.error(f"No XML file found in {zip_path}")
                     return None
                 
-                # Use the first XML file (usually only one)
-                xml_filename = xml_files[0]
-                xml_content = zip_file.read(xml_filename)
+                # Parse straight from the decompressing stream
+                with zip_file.open(xml_filename) as xml_stream:
+                    root = etree.parse(xml_stream, parser=self.xml_parser).getroot()
                 
-                return self.parse_xml_content(xml_content)
+                return self.parse_xml_root(root)
                 
         except Exception as e:
             logger.error(f"Failed to parse zip file {zip_path}: {e}")
@@ -87,9 +96,24 @@ class FDAXMLParser:
             Dictionary with metadata and sections
         """
         try:
-            # Parse XML
-            root = etree.fromstring(xml_content)
+            root = etree.fromstring(xml_content, parser=self.xml_parser)
+            return self.parse_xml_root(root)
             
+        except Exception as e:
+            logger.error(f"Failed to parse XML content: {e}")
+            return None
+    
+    def parse_xml_root(self, root) -> Optional[Dict]:
+        """
+        Extract structured data from an already-parsed XML document
+        
+        Args:
+            root: Root element of the SPL document
+            
+        Returns:
+            Dictionary with metadata and sections
+        """
+        try:
             # Extract metadata
             metadata = self._extract_metadata(root)
             
@@ -151,8 +175,7 @@ class FDAXMLParser:
                     # Try to extract drug name from title
                     title_text = title_elem.text.strip()
                     # Look for patterns like "VICTOZA" or "use VICTOZA"
-                    import re
-                    match = re.search(r'use ([A-Z][A-Z0-9]+)[\s®™]', title_text)
+                    match = TITLE_DRUG_NAME_RE.search(title_text)
                     if match:
                         metadata['name'] = match.group(1)
                     else:
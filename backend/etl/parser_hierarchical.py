@@ -18,8 +18,17 @@ from typing import Dict, List, Optional, Tuple, Any
 from pathlib import Path
 import logging
 
+from .parse_cache import disk_cached
+
 logger = logging.getLogger(__name__)
 
+HL7_NS = '{urn:hl7-org:v3}'
+SECTION_TAG = f'{HL7_NS}section'
+STRUCTURED_BODY_TAG = f'{HL7_NS}structuredBody'
+
+WHITESPACE_RE = re.compile(r'\s+')
+SECTION_PREFIX_RE = re.compile(r'^SECTION\s+\d+:', re.IGNORECASE)
+
 
 # COMPLETE LOINC Code Dictionary (80+ codes covering all FDA sections)
 COMPLETE_LOINC_CODES = {
@@ -106,28 +115,96 @@ class HierarchicalParser:
             'hl7': 'urn:hl7-org:v3',
             'xsi': 'http://www.w3.org/2001/XMLSchema-instance'
         }
+        # SPL documents can exceed libxml2's default size limits; skip ID
+        # indexing since we never look elements up by xml:id
+        self.xml_parser = etree.XMLParser(huge_tree=True, collect_ids=False)
     
+    @disk_cached(version=1)
     def parse_zip_file(self, zip_path: str) -> Optional[Dict]:
         """Parse an FDA label from a zip file"""
         try:
             with zipfile.ZipFile(zip_path, 'r') as zip_file:
-                xml_files = [f for f in zip_file.namelist() if f.endswith('.xml')]
+                xml_filename = next(
+                    (f for f in zip_file.namelist() if f.endswith('.xml')), None
+                )
                 
-                if not xml_files:
+                if xml_filename is None:
                     logger.error(f"No XML file found in {zip_path}")
                     return None
                 
-                xml_content = zip_file.read(xml_files[0])
-                return self.parse_xml_content(xml_content)
+                with zip_file.open(xml_filename) as xml_stream:
+                    return self.parse_xml_stream(xml_stream)
                 
         except Exception as e:
             logger.error(f"Failed to parse zip file {zip_path}: {e}")
             return None
     
+    def parse_xml_stream(self, xml_stream) -> Optional[Dict]:
+        """
+        Parse XML incrementally, one top-level section at a time
+        
+        Each top-level section is parsed (with its subsections) as soon as its
+        end tag is read, then cleared so the DOM never holds more than the
+        document header plus one section tree.
+        """
+        context = etree.iterparse(
+            xml_stream,
+            events=('end',),
+            tag=SECTION_TAG,
+            huge_tree=True,
+            collect_ids=False
+        )
+        
+        metadata = None
+        sections = []
+        top_level_count = 0
+        
+        for _, section_elem in context:
+            # Only structuredBody/component/section; nested sections are
+            # handled recursively once their top-level ancestor completes
+            component = section_elem.getparent()
+            body = component.getparent() if component is not None else None
+            if body is None or body.tag != STRUCTURED_BODY_TAG:
+                continue
+            
+            # The header precedes the body, so it is complete by now
+            if metadata is None:
+                metadata = self._extract_metadata(section_elem.getroottree().getroot())
+                if not metadata:
+                    logger.warning("Failed to extract metadata")
+                    return None
+            
+            top_level_count += 1
+            section_data_list = self._parse_section_recursive(
+                section_elem,
+                parent_id=None,
+                level=1,
+                section_num=str(top_level_count)
+            )
+            if section_data_list:
+                sections.extend(section_data_list)
+            
+            # Drop the parsed subtree and any earlier siblings
+            section_elem.clear()
+            while component.getprevious() is not None:
+                del body[0]
+        
+        if not sections:
+            logger.warning("Failed to extract sections")
+            return None
+        
+        sections = self._merge_duplicate_subsections(sections)
+        sections = self._renumber_sections(sections)
+        
+        return {
+            'metadata': metadata,
+            'sections': sections
+        }
+    
     def parse_xml_content(self, xml_content: bytes) -> Optional[Dict]:
         """Parse XML content with hierarchical structure"""
         try:
-            root = etree.fromstring(xml_content)
+            root = etree.fromstring(xml_content, parser=self.xml_parser)
             
             # Extract metadata
             metadata = self._extract_metadata(root)
@@ -314,10 +391,10 @@ class HierarchicalParser:
     def _clean_title(self, title: str) -> str:
         """Clean up title text"""
         # Remove extra whitespace
-        title = re.sub(r'\s+', ' ', title).strip()
+        title = WHITESPACE_RE.sub(' ', title).strip()
         
         # Remove common prefixes
-        title = re.sub(r'^SECTION\s+\d+:', '', title, flags=re.IGNORECASE).strip()
+        title = SECTION_PREFIX_RE.sub('', title).strip()
         
         return title
     
@@ -41,6 +41,9 @@ LOINC_SECTIONS = {
     "42229-5": {"title": "SPL UNCLASSIFIED SECTION", "importance": "low", "type": "other"},
 }
 
+# Rendering metadata for subsections, which have no LOINC entry of their own
+SUBSECTION_META = {"importance": "medium", "type": "general"}
+
 
 class UltraRefinedParser:
     """
@@ -54,19 +57,28 @@ class UltraRefinedParser:
             'xsi': 'http://www.w3.org/2001/XMLSchema-instance'
         }
         self.section_counter = {}
+        # Reused across files; huge_tree lifts libxml2's limits for very
+        # large labels and collect_ids skips building an unused ID table
+        self.xml_parser = etree.XMLParser(huge_tree=True, collect_ids=False)
     
     def parse_zip_file(self, zip_path: str) -> Optional[Dict]:
         """Parse an FDA label from a zip file"""
         try:
             with zipfile.ZipFile(zip_path, 'r') as zip_file:
-                xml_files = [f for f in zip_file.namelist() if f.endswith('.xml')]
+                xml_filename = next(
+                    (f for f in zip_file.namelist() if f.endswith('.xml')), None
+                )
                 
-                if not xml_files:
+                if xml_filename is None:
                     logger.error(f"No XML file found in {zip_path}")
                     return None
                 
-                xml_content = zip_file.read(xml_files[0])
-                return self.parse_xml_content(xml_content)
+                # Parse straight from the decompressing stream rather than
+                # reading the whole member into memory first
+                with zip_file.open(xml_filename) as xml_stream:
+                    root = etree.parse(xml_stream, parser=self.xml_parser).getroot()
+                
+                return self.parse_xml_root(root)
                 
         except Exception as e:
             logger.error(f"Failed to parse zip file {zip_path}: {e}")
@@ -75,8 +87,16 @@ class UltraRefinedParser:
     def parse_xml_content(self, xml_content: bytes) -> Optional[Dict]:
         """Parse XML content with ultra-refined structure"""
         try:
-            root = etree.fromstring(xml_content)
+            root = etree.fromstring(xml_content, parser=self.xml_parser)
+            return self.parse_xml_root(root)
             
+        except Exception as e:
+            logger.error(f"Failed to parse XML content: {e}")
+            return None
+    
+    def parse_xml_root(self, root) -> Optional[Dict]:
+        """Extract ultra-refined structure from an already-parsed document"""
+        try:
             # Extract comprehensive metadata
             metadata = self._extract_metadata_comprehensive(root)
             
@@ -293,7 +313,7 @@ class UltraRefinedParser:
             subsection_id = id_elem.get('root') if id_elem is not None else None
             
             # Get content
-            content_html = self._extract_content_ultra_refined(section_elem, {'importance': 'medium', 'type': 'general'})
+            content_html = self._extract_content_ultra_refined(section_elem, SUBSECTION_META)
             
             if not content_html:
                 return None
@@ -10,6 +10,11 @@ import re
 from dataclasses import dataclass
 from enum import Enum
 
+from .parse_cache import disk_cached
+
+
+DOSAGE_RE = re.compile(r'\b\d+\.?\d*\s*(mg|mcg|g|ml|units?)\b', re.IGNORECASE)
+
 
 class ImportanceLevel(Enum):
     CRITICAL = "critical"
@@ -127,6 +132,21 @@ class SmartHybridParser:
         '43684-0': 'USE IN SPECIFIC POPULATIONS',
     }
     
+    # Importance badge styling and labels for rendered HTML
+    BADGE_COLORS = {
+        ImportanceLevel.CRITICAL: 'bg-red-100 border-red-400 text-red-800',
+        ImportanceLevel.HIGH: 'bg-orange-100 border-orange-400 text-orange-800',
+        ImportanceLevel.MEDIUM: 'bg-blue-100 border-blue-400 text-blue-800',
+        ImportanceLevel.LOW: 'bg-gray-100 border-gray-400 text-gray-800',
+    }
+    
+    BADGE_LABELS = {
+        ImportanceLevel.CRITICAL: '⚠️ CRITICAL',
+        ImportanceLevel.HIGH: '⚠️ HIGH IMPORTANCE',
+        ImportanceLevel.MEDIUM: 'ℹ️ INFORMATION',
+        ImportanceLevel.LOW: '📋 REFERENCE',
+    }
+    
     # Warning keywords for detection
     WARNING_KEYWORDS = [
         'warning', 'caution', 'contraindicated', 'avoid', 'risk',
@@ -144,6 +164,7 @@ class SmartHybridParser:
     def __init__(self):
         self.css_styles = self._generate_css()
     
+    @disk_cached(version=1)
     def parse_zip_file(self, zip_path: str) -> Dict:
         """Parse ZIP file and return structured data"""
         import zipfile
@@ -319,22 +340,8 @@ class SmartHybridParser:
         html_parts = []
         
         # Add importance badge
-        badge_colors = {
-            ImportanceLevel.CRITICAL: 'bg-red-100 border-red-400 text-red-800',
-            ImportanceLevel.HIGH: 'bg-orange-100 border-orange-400 text-orange-800',
-            ImportanceLevel.MEDIUM: 'bg-blue-100 border-blue-400 text-blue-800',
-            ImportanceLevel.LOW: 'bg-gray-100 border-gray-400 text-gray-800',
-        }
-        
-        badge_labels = {
-            ImportanceLevel.CRITICAL: '⚠️ CRITICAL',
-            ImportanceLevel.HIGH: '⚠️ HIGH IMPORTANCE',
-            ImportanceLevel.MEDIUM: 'ℹ️ INFORMATION',
-            ImportanceLevel.LOW: '📋 REFERENCE',
-        }
-        
-        badge_class = badge_colors.get(importance, 'bg-gray-100')
-        badge_label = badge_labels.get(importance, 'INFORMATION')
+        badge_class = self.BADGE_COLORS.get(importance, 'bg-gray-100')
+        badge_label = self.BADGE_LABELS.get(importance, 'INFORMATION')
         
         html_parts.append(f'<div class="importance-badge {badge_class}">{badge_label}</div>')
         
@@ -434,8 +441,7 @@ class SmartHybridParser:
         data = {}
         
         # Extract dosages
-        dosage_pattern = r'\b\d+\.?\d*\s*(mg|mcg|g|ml|units?)\b'
-        dosages = list(set(re.findall(dosage_pattern, text, re.IGNORECASE)))
+        dosages = list(set(DOSAGE_RE.findall(text)))
         if dosages:
             data['dosages'] = [f"{d[0]}{d[1]}" for d in dosages]
         
@@ -11,13 +11,33 @@ import os
 os.environ['USE_TF'] = '0'
 os.environ['USE_TORCH'] = '1'
 
+import torch
 from sentence_transformers import SentenceTransformer
 from typing import List, Dict, Optional
+import functools
 import numpy as np
 import logging
 
+from .embedding_cache import EmbeddingDiskCache
+
 logger = logging.getLogger(__name__)
 
+# Bound on cached single-text embeddings (~1.5 KB each at 384 float32 dims);
+# the cache must stay bounded so a long-running API process cannot leak memory
+EMBEDDING_CACHE_SIZE = 4096
+
+
+def _unit_float32(embeddings: np.ndarray) -> np.ndarray:
+    """
+    Cast model output to float32 and re-normalize to unit length
+    normalize_embeddings=True already does this in the model's dtype, but
+    fp16 rounding on GPU leaves norms slightly off 1; exact unit vectors
+    let every similarity be a plain dot product
+    """
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(embeddings, axis=-1, keepdims=True)
+    return embeddings / np.maximum(norms, 1e-12)
+
 
 class VectorService:
     """
@@ -36,6 +56,15 @@ class VectorService:
         self.model = None
         self._initialized = False
         self.dimensions = 384  # Model output dimensions
+        self.device = 'cpu'
+        
+        # Per-instance LRU so repeated texts (e.g. popular queries) skip the model
+        self._encode_single_cached = functools.lru_cache(maxsize=EMBEDDING_CACHE_SIZE)(
+            self._encode_single
+        )
+        
+        # Optional persistent cache (set EMBEDDING_CACHE_DIR to enable)
+        self.disk_cache = EmbeddingDiskCache.from_env(model_name)
     
     def initialize(self):
         """
@@ -46,15 +75,68 @@ class VectorService:
             return
         
         try:
-            logger.info(f"Loading embedding model: {self.model_name}")
-            self.model = SentenceTransformer(self.model_name)
+            self.device = 'cuda' if torch.cuda.is_available() else 'cpu'
+            logger.info(f"Loading embedding model: {self.model_name} on {self.device}")
+            self.model = SentenceTransformer(self.model_name, device=self.device)
+            
+            # fp16 weights on GPU; outputs are cast back to float32 below
+            if self.device == 'cuda':
+                self.model.half()
+            
             self._initialized = True
-            logger.info(f"✅ Embedding model loaded (dimensions: {self.dimensions})")
+            logger.info(f"✅ Embedding model loaded (dimensions: {self.dimensions}, device: {self.device})")
             
         except Exception as e:
             logger.error(f"Failed to initialize embedding model: {e}")
             raise
     
+    def warmup(self):
+        """
+        Load the model and run one throwaway encode
+        Pays model load and CUDA context setup up front instead of on the
+        first real request
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        self.model.encode(["warmup"], convert_to_numpy=True, normalize_embeddings=True)
+        if self.device == 'cuda':
+            torch.cuda.synchronize()
+        
+        logger.info("✅ Embedding model warmed up")
+    
+    def _encode_single(self, text: str) -> bytes:
+        """Encode one text and return the normalized embedding as float32 bytes"""
+        if self.disk_cache is not None:
+            cached = self.disk_cache.get(text)
+            if cached is not None:
+                return np.asarray(cached, dtype=np.float32).tobytes()
+        
+        embedding = _unit_float32(self.model.encode(
+            text,
+            convert_to_numpy=True,
+            normalize_embeddings=True
+        ))
+        
+        if self.disk_cache is not None:
+            self.disk_cache.put(text, embedding)
+        
+        return embedding.tobytes()
+    
+    def encode_cached(self, text: str) -> np.ndarray:
+        """
+        Encode one text through the in-memory LRU cache
+        Identical texts reuse the earlier forward pass
+        
+        Returns:
+            384-dimensional float32 numpy array
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        # Copy so callers can't mutate the cached buffer
+        return np.frombuffer(self._encode_single_cached(text), dtype=np.float32).copy()
+    
     def generate_label_embedding(self, drug_data: Dict) -> np.ndarray:
         """
         Generate a single embedding for an entire drug label
@@ -100,11 +182,11 @@ class VectorService:
         combined_text = ". ".join(text_parts)
         
         # Generate embedding
-        embedding = self.model.encode(
+        embedding = _unit_float32(self.model.encode(
             combined_text,
             convert_to_numpy=True,
             normalize_embeddings=True  # L2 normalization for cosine similarity
-        )
+        ))
         
         logger.debug(f"Generated label embedding for: {drug_data.get('name', 'Unknown')}")
         return embedding
@@ -136,11 +218,7 @@ class VectorService:
             text = text[:2000]
         
         # Generate embedding
-        embedding = self.model.encode(
-            text,
-            convert_to_numpy=True,
-            normalize_embeddings=True
-        )
+        embedding = self.encode_cached(text)
         
         logger.debug(f"Generated section embedding for: {section_title or 'Unknown section'}")
         return embedding
@@ -174,21 +252,44 @@ class VectorService:
         if not texts:
             return np.array([])
         
-        # Batch encoding for efficiency
-        embeddings = self.model.encode(
-            texts,
-            convert_to_numpy=True,
-            normalize_embeddings=True,
-            batch_size=32,
-            show_progress_bar=len(texts) > 50
-        )
-        
-        logger.info(f"Generated {len(texts)} embeddings in batch")
+        if self.disk_cache is None:
+            missing = list(range(len(texts)))
+            embeddings = None
+        else:
+            # Serve hits from disk and only send the misses to the model
+            embeddings = np.empty((len(texts), self.dimensions), dtype=np.float32)
+            missing = []
+            for i, text in enumerate(texts):
+                cached = self.disk_cache.get(text)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    embeddings[i] = cached
+        
+        if missing:
+            # Batch encoding for efficiency
+            encoded = _unit_float32(self.model.encode(
+                [texts[i] for i in missing],
+                convert_to_numpy=True,
+                normalize_embeddings=True,
+                batch_size=32,
+                show_progress_bar=len(missing) > 50
+            ))
+            
+            if embeddings is None:
+                embeddings = encoded
+            else:
+                embeddings[missing] = encoded
+                for i, embedding in zip(missing, encoded):
+                    self.disk_cache.put(texts[i], embedding)
+        
+        logger.info(f"Generated {len(texts)} embeddings in batch ({len(texts) - len(missing)} cached)")
         return embeddings
     
     def compute_similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
         """
         Compute cosine similarity between two embeddings
+        Both must be unit vectors, as every generate_* method returns
         
         Returns:
             Similarity score between 0 and 1 (1 = identical)
@@ -212,22 +313,22 @@ class VectorService:
             self.initialize()
         
         # Generate query embedding
-        query_embedding = self.model.encode(
-            query,
-            convert_to_numpy=True,
-            normalize_embeddings=True
-        )
+        query_embedding = self.encode_cached(query)
         
-        # Compute similarities
-        results = []
-        for label_id, embedding in label_embeddings:
-            similarity = self.compute_similarity(query_embedding, embedding)
-            results.append((label_id, similarity))
+        if not label_embeddings:
+            return []
         
-        # Sort by similarity (descending)
-        results.sort(key=lambda x: x[1], reverse=True)
+        # Compute all similarities in one matrix-vector product; embeddings
+        # are normalized, so the dot product is the cosine similarity
+        label_ids = [label_id for label_id, _ in label_embeddings]
+        embedding_matrix = np.asarray(
+            [embedding for _, embedding in label_embeddings], dtype=np.float32
+        )
+        similarities = embedding_matrix @ query_embedding
         
-        return results
+        # Rank by similarity (descending); stable so ties keep input order
+        order = np.argsort(-similarities, kind='stable')
+        return [(label_ids[i], float(similarities[i])) for i in order]
 
 
 # Global instance (singleton pattern)
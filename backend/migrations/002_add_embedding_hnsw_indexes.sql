@@ -0,0 +1,13 @@
+-- Migration: Add HNSW indexes for pgvector cosine similarity search
+-- Date: 2026-10-16
+-- Purpose: Let `ORDER BY embedding <=> :query_vector LIMIT k` use an index scan instead of a full table scan
+
+-- Section-level embeddings (RAG chatbot retrieval)
+CREATE INDEX IF NOT EXISTS idx_embedding_hnsw
+ON section_embeddings USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- Label-level embeddings (dashboard semantic search)
+CREATE INDEX IF NOT EXISTS idx_label_embedding_hnsw
+ON drug_labels USING hnsw (label_embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
@@ -58,6 +58,13 @@ class DrugLabel(Base):
     __table_args__ = (
         Index('idx_drug_set_version', 'set_id', 'version'),
         Index('idx_drug_current', 'is_current_version', 'status'),
+        Index(
+            'idx_label_embedding_hnsw',
+            'label_embedding',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'label_embedding': 'vector_cosine_ops'},
+        ),
     )
     
     def __repr__(self):
@@ -151,6 +158,15 @@ class SectionEmbedding(Base):
     __table_args__ = (
         Index('idx_embedding_drug', 'drug_name'),
         Index('idx_embedding_loinc', 'section_loinc'),
+        # HNSW index so `embedding <=> :query_vector` ORDER BY ... LIMIT k
+        # is an approximate index scan instead of a full table scan
+        Index(
+            'idx_embedding_hnsw',
+            'embedding',
+            postgresql_using='hnsw',
+            postgresql_with={'m': 16, 'ef_construction': 64},
+            postgresql_ops={'embedding': 'vector_cosine_ops'},
+        ),
     )
     
     def __repr__(self):
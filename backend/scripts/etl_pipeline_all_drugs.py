@@ -16,7 +16,7 @@ from typing import List, Dict
 from models.db_session import AsyncSessionLocal
 from models.database import DrugLabel, DrugSection, SectionEmbedding
 from etl.parser_hierarchical import HierarchicalParser
-from etl.vector_service import VectorService
+from etl.vector_service import get_vector_service
 from sqlalchemy import select, delete, text
 import logging
 from collections import Counter
@@ -223,9 +223,8 @@ async def generate_embeddings(drug_id: int, drug_name: str):
     
     logger.info(f"🔮 Generating embeddings for {drug_name}...")
     
-    # Initialize vector service
-    vector_service = VectorService()
-    vector_service.initialize()
+    # Shared model, loaded once for the whole run
+    vector_service = get_vector_service()
     
     async with AsyncSessionLocal() as session:
         try:
@@ -243,9 +242,10 @@ async def generate_embeddings(drug_id: int, drug_name: str):
                     delete(SectionEmbedding).where(SectionEmbedding.section_id == section.id)
                 )
             
-            total_chunks = 0
-            
-            # Generate embeddings for each section
+            # Collect every chunk first so the model encodes them in batches
+            # rather than one forward pass per chunk
+            pending_chunks = []
+            chunk_texts = []
             for section in sections:
                 # Skip empty sections
                 if not section.content or len(section.content.strip()) < 50:
@@ -254,25 +254,27 @@ async def generate_embeddings(drug_id: int, drug_name: str):
                 # Chunk the section content
                 chunks = chunk_text(section.content, max_chars=2000, overlap=200)
                 
-                # Generate embeddings for each chunk
                 for chunk_idx, chunk in enumerate(chunks):
-                    # Generate embedding
-                    embedding = vector_service.generate_section_embedding(
-                        chunk,
-                        section_title=section.title
-                    )
-                    
-                    # Save to database
-                    section_embedding = SectionEmbedding(
-                        section_id=section.id,
-                        chunk_index=chunk_idx,
-                        chunk_text=chunk,
-                        embedding=embedding.tolist(),
-                        drug_name=drug_name,
-                        section_loinc=section.loinc_code
-                    )
-                    session.add(section_embedding)
-                    total_chunks += 1
+                    pending_chunks.append((section, chunk_idx, chunk))
+                    # Same text generate_section_embedding would build
+                    text_to_embed = f"{section.title}: {chunk}" if section.title else chunk
+                    chunk_texts.append(text_to_embed[:2000])
+            
+            embeddings = vector_service.generate_batch_embeddings(chunk_texts)
+            
+            total_chunks = 0
+            for (section, chunk_idx, chunk), embedding in zip(pending_chunks, embeddings):
+                # Save to database
+                section_embedding = SectionEmbedding(
+                    section_id=section.id,
+                    chunk_index=chunk_idx,
+                    chunk_text=chunk,
+                    embedding=embedding.tolist(),
+                    drug_name=drug_name,
+                    section_loinc=section.loinc_code
+                )
+                session.add(section_embedding)
+                total_chunks += 1
             
             await session.commit()
             logger.info(f"   ✅ Generated {total_chunks} embeddings")
@@ -292,6 +294,9 @@ async def process_all_drugs():
     
     data_dir = Path(__file__).parent.parent.parent / 'data' / 'raw'
     
+    # Load and warm the embedding model once, before the per-drug loop
+    get_vector_service().warmup()
+    
     # Statistics
     stats = {
         'total': len(DRUG_MAPPING),
@@ -42,6 +42,16 @@ async def add_watchdog_tables():
                 text("""
                     ALTER TABLE drug_labels 
                     ADD COLUMN IF NOT EXISTS last_version_check TIMESTAMP
+                """),
+                
+                # DailyMed cache validators for conditional version checks
+                text("""
+                    ALTER TABLE drug_labels 
+                    ADD COLUMN IF NOT EXISTS dailymed_etag VARCHAR(255)
+                """),
+                text("""
+                    ALTER TABLE drug_labels 
+                    ADD COLUMN IF NOT EXISTS dailymed_last_modified VARCHAR(64)
                 """)
             ]
             
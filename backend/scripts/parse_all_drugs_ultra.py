@@ -15,6 +15,13 @@ from models.database import DrugLabel, DrugSection
 import asyncio
 from sqlalchemy import select, delete
 
+IMPORTANCE_ICONS = {
+    'critical': '🔴',
+    'high': '🟠',
+    'medium': '🟡',
+    'low': '⚪'
+}
+
 
 async def parse_all_drugs():
     """Parse all 19 drugs with ultra-refined parser for consistent comparison"""
@@ -93,12 +100,7 @@ async def parse_all_drugs():
                     session.add(new_section)
                     
                     # Show importance indicator
-                    importance_icon = {
-                        'critical': '🔴',
-                        'high': '🟠', 
-                        'medium': '🟡',
-                        'low': '⚪'
-                    }.get(section.get('importance', 'medium'), '⚪')
+                    importance_icon = IMPORTANCE_ICONS.get(section.get('importance', 'medium'), '⚪')
                     
                     print(f"      {importance_icon} [{section_num}] {section['title']}")
                 
@@ -15,6 +15,13 @@ from models.database import DrugLabel, DrugSection
 import asyncio
 from sqlalchemy import select, delete
 
+IMPORTANCE_ICONS = {
+    'critical': '🔴',
+    'high': '🟠',
+    'medium': '🟡',
+    'low': '⚪'
+}
+
 
 async def parse_one_drug_test():
     """Test parsing ONE drug first before doing all"""
@@ -59,12 +66,7 @@ async def parse_one_drug_test():
         # Show section structure
         print(f"\n📝 Section Structure:")
         for section in sections[:5]:  # Show first 5
-            importance_icon = {
-                'critical': '🔴',
-                'high': '🟠',
-                'medium': '🟡',
-                'low': '⚪'
-            }.get(section.get('importance', 'medium'), '⚪')
+            importance_icon = IMPORTANCE_ICONS.get(section.get('importance', 'medium'), '⚪')
             
             print(f"   {importance_icon} [{section['section_number']}] {section['title']}")
             print(f"      LOINC: {section['loinc_code']}")
@@ -102,12 +104,7 @@ async def parse_one_drug_test():
                 session.add(new_section)
                 
                 # Show importance indicator
-                importance_icon = {
-                    'critical': '🔴',
-                    'high': '🟠',
-                    'medium': '🟡',
-                    'low': '⚪'
-                }.get(section.get('importance', 'medium'), '⚪')
+                importance_icon = IMPORTANCE_ICONS.get(section.get('importance', 'medium'), '⚪')
                 
                 print(f"      {importance_icon} [{section['section_number']}] {section['title']}")
             
@@ -195,12 +192,7 @@ async def parse_all_drugs():
                     session.add(new_section)
                     
                     # Show importance indicator
-                    importance_icon = {
-                        'critical': '🔴',
-                        'high': '🟠',
-                        'medium': '🟡',
-                        'low': '⚪'
-                    }.get(section.get('importance', 'medium'), '⚪')
+                    importance_icon = IMPORTANCE_ICONS.get(section.get('importance', 'medium'), '⚪')
                     
                     print(f"      {importance_icon} [{section['section_number']}] {section['title']}")
                 
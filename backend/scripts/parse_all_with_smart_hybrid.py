@@ -3,7 +3,10 @@ Parse All 19 Drugs with Smart Hybrid Parser
 This will replace the existing parsed data with professionally structured data
 """
 
+import functools
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
@@ -17,6 +20,17 @@ from datetime import datetime
 import hashlib
 
 
+@functools.lru_cache(maxsize=1)
+def _get_parser() -> SmartHybridParser:
+    """One parser per worker process, reused for every ZIP it handles"""
+    return SmartHybridParser()
+
+
+def _parse_zip(zip_path: str):
+    """Parse one ZIP in a worker process with its own parser instance"""
+    return _get_parser().parse_zip_file(zip_path)
+
+
 async def parse_all_drugs():
     """Parse all drugs with Smart Hybrid Parser and update database"""
     
@@ -33,7 +47,11 @@ async def parse_all_drugs():
     
     print(f"📦 Found {len(zip_files)} drugs to parse\n")
     
-    parser = SmartHybridParser()
+    # Parsing is CPU-bound and independent per file, so fan it out across
+    # processes; database writes below stay on this event loop, in order
+    executor = ProcessPoolExecutor(max_workers=max(1, (os.cpu_count() or 2) // 2))
+    parse_futures = [executor.submit(_parse_zip, str(zip_file)) for zip_file in zip_files]
+    
     stats = {
         'success': 0,
         'failed': 0,
@@ -50,7 +68,7 @@ async def parse_all_drugs():
         
         try:
             # Parse ZIP file
-            result = parser.parse_zip_file(str(zip_file))
+            result = await asyncio.wrap_future(parse_futures[i - 1])
             
             if not result:
                 print(f"❌ Failed to parse {zip_file.name}")
@@ -144,6 +162,8 @@ async def parse_all_drugs():
             import traceback
             traceback.print_exc()
     
+    executor.shutdown()
+    
     # Print summary
     print("\n" + "="*80)
     print("📊 PARSING SUMMARY")
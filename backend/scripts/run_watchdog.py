@@ -5,6 +5,7 @@ Runs version checks, downloads, S3 uploads, and ETL processing
 
 import asyncio
 import argparse
+import logging
 import os
 import sys
 from datetime import datetime
@@ -13,6 +14,7 @@ from pathlib import Path
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from core.event_loop import install_uvloop
 from services.watchdog.version_checker import VersionChecker
 from services.watchdog.s3_uploader import S3Uploader
 from services.watchdog.notifier import Notifier
@@ -33,7 +35,10 @@ async def run_watchdog_pipeline(mode: str = 'daily'):
     print(f"{'='*60}\n")
     
     # Initialize services
-    version_checker = VersionChecker()
+    # Manual runs check one drug on request and want fresh data
+    version_checker = VersionChecker(
+        cache_policy='short' if mode == 'manual' else 'long'
+    )
     s3_uploader = S3Uploader()
     notifier = Notifier()
     
@@ -63,15 +68,12 @@ async def run_watchdog_pipeline(mode: str = 'daily'):
             'errors': []
         }
         
-        for drug in drugs_to_check:
+        # Poll DailyMed for all drugs at once, then report in order
+        check_results = await version_checker.check_versions_bulk(drugs_to_check)
+        
+        for drug, result in zip(drugs_to_check, check_results):
             print(f"\n   Checking: {drug['drug_name']} (SET_ID: {drug['set_id']})")
             
-            result = await version_checker.check_version(
-                drug_id=drug['drug_id'],
-                set_id=drug['set_id'],
-                current_version=drug['current_version']
-            )
-            
             if result['status'] == 'new_version':
                 results['new_versions'].append(result)
                 print(f"      🆕 New version found: {result['new_version']}")
@@ -83,59 +85,52 @@ async def run_watchdog_pipeline(mode: str = 'daily'):
                 results['errors'].append(result)
                 print(f"      ❌ Error: {result.get('error', 'Unknown')}")
         
+        # Remember DailyMed validators so the next run can get a 304
+        if results['up_to_date']:
+            async with AsyncSessionLocal() as session:
+                await version_checker.save_validators(session, results['up_to_date'])
+        
         # Step 3: Download and upload new versions to S3
         if results['new_versions']:
             print(f"\n📦 Step 3: Processing {len(results['new_versions'])} new versions...")
             
-            for result in results['new_versions']:
+            # Stream ZIPs from DailyMed straight to S3, several at a time
+            print(f"   ⬇️  Streaming from DailyMed to S3...")
+            s3_keys = await version_checker.fetch_and_upload_bulk(
+                s3_uploader, results['new_versions']
+            )
+            
+            # Version updates are written together once all uploads finish
+            pending_updates = []
+            
+            for result, s3_key in zip(results['new_versions'], s3_keys):
                 print(f"\n   Processing: {result['drug_name']}")
                 
-                # Download ZIP
-                print(f"      ⬇️  Downloading from DailyMed...")
-                zip_path = await version_checker.download_label_zip(
-                    set_id=result['set_id'],
-                    version=result['new_version']
-                )
-                
-                if zip_path:
-                    print(f"      ✓ Downloaded to: {zip_path}")
+                if s3_key:
+                    print(f"      ✓ Uploaded to S3: {s3_key}")
+                    result['s3_key'] = s3_key
                     
-                    # Upload to S3
-                    print(f"      ⬆️  Uploading to S3...")
-                    s3_key = await s3_uploader.upload_label(
-                        zip_path=zip_path,
-                        drug_id=result['drug_id'],
-                        set_id=result['set_id'],
-                        version=result['new_version']
-                    )
-                    
-                    if s3_key:
-                        print(f"      ✓ Uploaded to S3: {s3_key}")
-                        result['s3_key'] = s3_key
-                        
-                        # Update database with new version
-                        async with AsyncSessionLocal() as session:
-                            await version_checker.save_version_update(
-                                session=session,
-                                drug_id=result['drug_id'],
-                                old_version=result['current_version'],
-                                new_version=result['new_version'],
-                                s3_key=s3_key,
-                                publish_date=result['publish_date']
-                            )
-                        print(f"      ✓ Database updated")
-                    else:
-                        print(f"      ❌ S3 upload failed")
-                        results['errors'].append({
-                            **result,
-                            'error': 'S3 upload failed'
-                        })
+                    pending_updates.append({
+                        'drug_id': result['drug_id'],
+                        'old_version': result['current_version'],
+                        'new_version': result['new_version'],
+                        's3_key': s3_key,
+                        'publish_date': result['publish_date'],
+                        'etag': result.get('etag'),
+                        'last_modified': result.get('last_modified')
+                    })
                 else:
-                    print(f"      ❌ Download failed")
+                    print(f"      ❌ Download or S3 upload failed")
                     results['errors'].append({
                         **result,
-                        'error': 'Download failed'
+                        'error': 'Download or S3 upload failed'
                     })
+            
+            # Update database with all new versions in one transaction
+            if pending_updates:
+                async with AsyncSessionLocal() as session:
+                    await version_checker.save_version_updates_bulk(session, pending_updates)
+                print(f"\n   ✓ Database updated ({len(pending_updates)} version(s))")
         else:
             print(f"\n✓ Step 3: No new versions to process")
         
@@ -195,7 +190,15 @@ def main():
     
     args = parser.parse_args()
     
+    # Service warnings (failed downloads, stale DailyMed data) go to the
+    # run log; set WATCHDOG_LOG_LEVEL=DEBUG for per-download detail
+    logging.basicConfig(
+        level=os.getenv('WATCHDOG_LOG_LEVEL', 'INFO').upper(),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    
     # Run async pipeline
+    install_uvloop()
     asyncio.run(run_watchdog_pipeline(mode=args.mode))
 
 
@@ -70,15 +70,19 @@ async def test_enhanced_parser():
         print(f"   Drug ID: {drug.id}")
         print(f"   Name: {drug.name}\n")
         
+        # Prefetch this drug's sections once instead of a SELECT per section
+        existing_result = await session.execute(
+            select(DBDrugSection).where(DBDrugSection.drug_label_id == drug.id)
+        )
+        existing_sections = {
+            db_section.loinc_code: db_section
+            for db_section in existing_result.scalars().all()
+        }
+        
         # Update sections
         updated = 0
         for section in sections:
-            section_query = select(DBDrugSection).where(
-                DBDrugSection.drug_label_id == drug.id,
-                DBDrugSection.loinc_code == section['loinc_code']
-            )
-            section_result = await session.execute(section_query)
-            db_section = section_result.scalar_one_or_none()
+            db_section = existing_sections.get(section['loinc_code'])
             
             if db_section:
                 db_section.content = section['content']
@@ -7,12 +7,15 @@ Validates:
 - Content quality
 """
 
+import io
+import itertools
 import sys
+from collections import defaultdict
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from etl.parser_hierarchical import HierarchicalParser
-import json
+import numpy as np
 
 
 def test_byetta():
@@ -53,30 +56,30 @@ def test_byetta():
     print(f"\n📚 SECTIONS: {len(sections)} total")
     print("=" * 80)
     
-    # Group by level
-    by_level = {}
+    # Group by level once; the summary below reuses this index
+    by_level = defaultdict(list)
     for section in sections:
-        level = section['level']
-        if level not in by_level:
-            by_level[level] = []
-        by_level[level].append(section)
+        by_level[section['level']].append(section)
+    main_sections = by_level.get(1, [])
+    subsection_count = len(sections) - len(main_sections)
     
     print(f"\nSection Distribution:")
     for level in sorted(by_level.keys()):
         print(f"  Level {level}: {len(by_level[level])} sections")
     
     # Display section structure
-    print(f"\n{'Number':<10} {'Level':<6} {'LOINC':<12} {'Title'}")
-    print("-" * 90)
-    
-    for section in sections:
-        num = section['section_number']
-        level = section['level']
-        loinc = section.get('loinc_code', 'N/A') or 'N/A'
-        title = section['title'][:60]
-        
-        indent = "  " * (level - 1)
-        print(f"{num:<10} {level:<6} {loinc:<12} {indent}{title}")
+    # Build the whole table and write it once instead of a print() per row
+    structure_lines = [
+        f"\n{'Number':<10} {'Level':<6} {'LOINC':<12} {'Title'}",
+        "-" * 90,
+    ]
+    structure_lines.extend(
+        f"{section['section_number']:<10} {section['level']:<6} "
+        f"{section.get('loinc_code', 'N/A') or 'N/A':<12} "
+        f"{'  ' * (section['level'] - 1)}{section['title'][:60]}"
+        for section in sections
+    )
+    sys.stdout.write("\n".join(structure_lines) + "\n")
     
     # Quality checks
     print("\n" + "="*80)
@@ -90,26 +93,40 @@ def test_byetta():
         'missing_loinc': 0
     }
     
+    # Single pass: quality issues plus the table stats reported further down
+    sections_with_tables = 0
+    table_example = None
+    
     for section in sections:
-        if 'UNCLASSIFIED' in section['title'].upper():
+        title = section['title']
+        content = section.get('content') or ''
+        
+        if 'UNCLASSIFIED' in title.upper():
             issues['unclassified'] += 1
-        if not section['title'] or section['title'].strip() == '':
+        if not title.strip():
             issues['missing_title'] += 1
-        if not section.get('content') or len(section['content'].strip()) < 20:
+        if len(content.strip()) < 20:
             issues['empty_content'] += 1
         if section['level'] == 1 and not section.get('loinc_code'):
             issues['missing_loinc'] += 1
-    
-    print(f"\n✓ Clean titles: {len(sections) - issues['unclassified']} / {len(sections)}")
-    print(f"✗ 'SPL UNCLASSIFIED': {issues['unclassified']}")
-    print(f"✓ All titled: {len(sections) - issues['missing_title']} / {len(sections)}")
-    print(f"✗ Missing titles: {issues['missing_title']}")
-    print(f"✓ Good content: {len(sections) - issues['empty_content']} / {len(sections)}")
-    print(f"✗ Empty content: {issues['empty_content']}")
-    print(f"✗ Main sections without LOINC: {issues['missing_loinc']}")
+        
+        has_pipe = '|' in content
+        if has_pipe or 'Table' in content:
+            sections_with_tables += 1
+        if table_example is None and has_pipe and content.count('\n') > 2:
+            table_example = section
+    
+    sys.stdout.write("\n".join([
+        f"\n✓ Clean titles: {len(sections) - issues['unclassified']} / {len(sections)}",
+        f"✗ 'SPL UNCLASSIFIED': {issues['unclassified']}",
+        f"✓ All titled: {len(sections) - issues['missing_title']} / {len(sections)}",
+        f"✗ Missing titles: {issues['missing_title']}",
+        f"✓ Good content: {len(sections) - issues['empty_content']} / {len(sections)}",
+        f"✗ Empty content: {issues['empty_content']}",
+        f"✗ Main sections without LOINC: {issues['missing_loinc']}",
+    ]) + "\n")
     
     # Show sample content from first main section
-    main_sections = [s for s in sections if s['level'] == 1]
     if main_sections:
         sample = main_sections[0]
         print(f"\n" + "="*80)
@@ -135,36 +152,30 @@ def test_byetta():
     print("📊 TABLE ANALYSIS")
     print("="*80)
     
-    sections_with_tables = 0
-    for section in sections:
-        content = section.get('content', '')
-        if '|' in content or 'Table' in content:
-            sections_with_tables += 1
-    
     print(f"\nSections with table data: {sections_with_tables}")
     
     # Show table example if exists
-    for section in sections:
-        content = section.get('content', '')
-        if '|' in content and len(content.split('\n')) > 3:
-            print(f"\n📊 Table Example from: {section['title']}")
-            print("-" * 80)
-            # Show first 10 lines of table
-            table_lines = content.split('\n')[:10]
-            for line in table_lines:
-                print(line)
-            if len(content.split('\n')) > 10:
-                print("...")
-            break
+    if table_example is not None:
+        content = table_example['content']
+        print(f"\n📊 Table Example from: {table_example['title']}")
+        print("-" * 80)
+        # Show first 10 lines of table without splitting the whole section
+        for line in itertools.islice(io.StringIO(content), 10):
+            print(line.rstrip('\n'))
+        if content.count('\n') > 9:
+            print("...")
     
     # Summary
     print(f"\n" + "="*80)
     print("📊 SUMMARY")
     print("="*80)
     print(f"✅ Total sections parsed: {len(sections)}")
-    print(f"✅ Main sections (Level 1): {len([s for s in sections if s['level'] == 1])}")
-    print(f"✅ Subsections (Level 2+): {len([s for s in sections if s['level'] > 1])}")
-    print(f"✅ Average content length: {sum(len(s.get('content', '')) for s in sections) // len(sections)} chars")
+    print(f"✅ Main sections (Level 1): {len(main_sections)}")
+    print(f"✅ Subsections (Level 2+): {subsection_count}")
+    content_lengths = np.fromiter(
+        (len(s.get('content', '')) for s in sections), dtype=np.int64, count=len(sections)
+    )
+    print(f"✅ Average content length: {int(content_lengths.sum()) // len(sections)} chars")
     print(f"✅ Sections with LOINC codes: {len([s for s in sections if s.get('loinc_code')])}")
     
     if issues['unclassified'] == 0 and issues['missing_title'] == 0:
@@ -41,70 +41,41 @@ async def test_sendgrid():
         print("\n⚠️  Warning: No notification emails configured!")
         print("   Set with: export NOTIFICATION_EMAILS='email1@example.com,email2@example.com'")
     
-    # Test SendGrid API connectivity
-    print("\n2️⃣  Testing SendGrid API Connectivity...")
-    
-    try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            # Test API key validity with sender verification endpoint
-            headers = {
-                "Authorization": f"Bearer {sendgrid_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            # Get account details
-            response = await client.get(
-                "https://api.sendgrid.com/v3/user/profile",
-                headers=headers
-            )
-            
-            if response.status_code == 200:
-                profile = response.json()
-                print(f"   ✅ API Key Valid!")
-                print(f"   Account: {profile.get('username', 'N/A')}")
-                print(f"   Email: {profile.get('email', 'N/A')}")
-            elif response.status_code == 401:
-                print(f"   ❌ Invalid API Key!")
-                print(f"   Status: {response.status_code}")
-                return False
-            else:
-                print(f"   ⚠️  Unexpected response: {response.status_code}")
-                print(f"   Body: {response.text[:200]}")
-    
-    except Exception as e:
-        print(f"   ❌ Connection error: {str(e)}")
-        return False
-    
-    # Send test email if emails are configured
-    if notification_emails:
-        print("\n3️⃣  Sending Test Email...")
-        
-        try:
-            emails = [e.strip() for e in notification_emails.split(',') if e.strip()]
+    async with httpx.AsyncClient(
+        http2=True,
+        timeout=10.0,
+        headers={
+            "Authorization": f"Bearer {sendgrid_api_key}",
+            "Content-Type": "application/json"
+        }
+    ) as client:
+        if notification_emails:
+            # A 401 from the mail send says the same as a failed profile
+            # lookup, so skip the extra round trip and validate here
+            print("\n2️⃣  Sending Test Email (validates API key)...")
             
-            url = "https://api.sendgrid.com/v3/mail/send"
-            headers = {
-                "Authorization": f"Bearer {sendgrid_api_key}",
-                "Content-Type": "application/json"
-            }
-            
-            timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
-            
-            payload = {
-                "personalizations": [
-                    {
-                        "to": [{"email": email} for email in emails],
-                        "subject": "✅ Watchdog Test Email - Configuration Successful"
-                    }
-                ],
-                "from": {
-                    "email": "watchdog@yourdomain.com",
-                    "name": "Label Analyzer Watchdog"
-                },
-                "content": [
-                    {
-                        "type": "text/plain",
-                        "value": f"""
+            try:
+                emails = [e.strip() for e in notification_emails.split(',') if e.strip()]
+                
+                url = "https://api.sendgrid.com/v3/mail/send"
+                
+                timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
+                
+                payload = {
+                    "personalizations": [
+                        {
+                            "to": [{"email": email} for email in emails],
+                            "subject": "✅ Watchdog Test Email - Configuration Successful"
+                        }
+                    ],
+                    "from": {
+                        "email": "watchdog@yourdomain.com",
+                        "name": "Label Analyzer Watchdog"
+                    },
+                    "content": [
+                        {
+                            "type": "text/plain",
+                            "value": f"""
 🐕 Watchdog Pipeline - Test Email
 
 This is a test email to verify your SendGrid configuration.
@@ -118,27 +89,60 @@ If you received this email, your SendGrid integration is working correctly!
 GLP-1 Regulatory Intelligence Platform
 Automated Label Monitoring System
 """
-                    }
-                ]
-            }
-            
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.post(url, headers=headers, json=payload)
+                        }
+                    ]
+                }
+                
+                response = await client.post(url, json=payload)
                 
                 if response.status_code == 202:
+                    print(f"   ✅ API Key Valid!")
                     print(f"   ✅ Test email sent successfully!")
                     print(f"   Recipients: {', '.join(emails)}")
                     print(f"   Status: {response.status_code} (Accepted)")
                     print("\n   📧 Check your inbox!")
+                elif response.status_code == 401:
+                    print(f"   ❌ Invalid API Key!")
+                    print(f"   Status: {response.status_code}")
+                    return False
+                elif response.status_code == 403:
+                    print(f"   ❌ Sender not verified or API key lacks Mail Send permission")
+                    print(f"   Status: {response.status_code}")
+                    print(f"   Response: {response.text[:500]}")
+                    return False
                 else:
                     print(f"   ❌ Failed to send email")
                     print(f"   Status: {response.status_code}")
                     print(f"   Response: {response.text[:500]}")
                     return False
-        
-        except Exception as e:
-            print(f"   ❌ Error sending email: {str(e)}")
-            return False
+            
+            except Exception as e:
+                print(f"   ❌ Error sending email: {str(e)}")
+                return False
+        else:
+            # Without recipients the profile lookup is the only key check
+            print("\n2️⃣  Testing SendGrid API Connectivity...")
+            
+            try:
+                # Get account details
+                response = await client.get("https://api.sendgrid.com/v3/user/profile")
+                
+                if response.status_code == 200:
+                    profile = response.json()
+                    print(f"   ✅ API Key Valid!")
+                    print(f"   Account: {profile.get('username', 'N/A')}")
+                    print(f"   Email: {profile.get('email', 'N/A')}")
+                elif response.status_code == 401:
+                    print(f"   ❌ Invalid API Key!")
+                    print(f"   Status: {response.status_code}")
+                    return False
+                else:
+                    print(f"   ⚠️  Unexpected response: {response.status_code}")
+                    print(f"   Body: {response.text[:200]}")
+            
+            except Exception as e:
+                print(f"   ❌ Connection error: {str(e)}")
+                return False
     
     print("\n" + "=" * 70)
     print("✅ SENDGRID CONFIGURATION TEST PASSED")
@@ -9,11 +9,12 @@ from pathlib import Path
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from core.event_loop import install_uvloop
 from etl.parser import FDAXMLParser
 from models.db_session import AsyncSessionLocal
 from models.database import DrugLabel, DrugSection as DBDrugSection
 import asyncio
-from sqlalchemy import select
+from sqlalchemy import select, update, bindparam
 
 async def test_single_label():
     """Parse one label and update it in the database"""
@@ -65,18 +66,22 @@ async def test_single_label():
         print(f"   ID: {drug_id}")
         print(f"   Name: {drug_name}")
         
-        # Update each section with HTML content
-        for section in sections:
-            # Find the section
-            section_query = select(DBDrugSection).where(
-                DBDrugSection.drug_label_id == drug_id,
-                DBDrugSection.loinc_code == section['loinc_code']
+        # Update all sections with HTML content in a single executemany
+        # round trip instead of a SELECT + UPDATE per section
+        sections_table = DBDrugSection.__table__
+        update_stmt = (
+            update(sections_table)
+            .where(
+                sections_table.c.drug_label_id == drug_id,
+                sections_table.c.loinc_code == bindparam('b_loinc_code')
             )
-            section_result = await session.execute(section_query)
-            db_section = section_result.scalar_one_or_none()
-            
-            if db_section:
-                db_section.content = section['content']
+            .values(content=bindparam('b_content'))
+        )
+        if sections:
+            await session.execute(update_stmt, [
+                {'b_loinc_code': section['loinc_code'], 'b_content': section['content']}
+                for section in sections
+            ])
         
         # Commit changes
         await session.commit()
@@ -86,4 +91,5 @@ async def test_single_label():
         print(f"   Drug: {drug_name}")
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(test_single_label())
@@ -4,16 +4,25 @@ Run this to begin the enhanced parsing process
 """
 
 import sys
+from collections import defaultdict
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from core.event_loop import install_uvloop
 from etl.smart_hybrid_parser import SmartHybridParser
 from models.db_session import AsyncSessionLocal
 from models.database import DrugLabel
 import asyncio
 from sqlalchemy import select, text
 
+IMPORTANCE_ICONS = {
+    'critical': '🔴',
+    'high': '🟠',
+    'medium': '🔵',
+    'low': '⚪'
+}
+
 
 async def test_smart_parser():
     """Test the smart hybrid parser with one drug"""
@@ -53,21 +62,21 @@ async def test_smart_parser():
     print(f"Section Structure:")
     print(f"  Total sections: {len(sections)}")
     
-    # Show hierarchy
-    main_sections = [s for s in sections if s.level == 1]
-    subsections = [s for s in sections if s.level > 1]
+    # Show hierarchy; index children by parent once instead of rescanning
+    # every section for each main section printed below
+    main_sections = []
+    subsections = []
+    by_parent = defaultdict(list)
+    for s in sections:
+        (main_sections if s.level == 1 else subsections).append(s)
+        by_parent[s.parent_id].append(s)
     
     print(f"  Main sections: {len(main_sections)}")
     print(f"  Subsections: {len(subsections)}\n")
     
     print("Main Sections:")
     for section in main_sections[:10]:  # Show first 10
-        importance_icon = {
-            'critical': '🔴',
-            'high': '🟠',
-            'medium': '🔵',
-            'low': '⚪'
-        }.get(section.importance.value, '⚪')
+        importance_icon = IMPORTANCE_ICONS.get(section.importance.value, '⚪')
         
         print(f"  {importance_icon} [{section.section_path}] {section.title}")
         print(f"     LOINC: {section.loinc_code} | Words: {section.word_count}")
@@ -78,8 +87,7 @@ async def test_smart_parser():
             print(f"     ⚠️  Contains warnings")
         
         # Show subsections
-        subsecs = [s for s in sections if s.parent_id == section.loinc_code]
-        for subsec in subsecs[:3]:
+        for subsec in by_parent[section.loinc_code][:3]:
             print(f"       └─ [{subsec.section_path}] {subsec.title}")
     
     print("\n" + "="*80)
@@ -148,6 +156,8 @@ This script will:
 After reviewing the results, you can proceed to parse all drugs.
     """)
     
+    install_uvloop()
+    
     # Check database
     schema_ready = asyncio.run(check_database_ready())
     
@@ -6,11 +6,19 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from core.event_loop import install_uvloop
 from etl.parser_ultra_refined import UltraRefinedParser
 from models.db_session import AsyncSessionLocal
 from models.database import DrugLabel, DrugSection as DBDrugSection
 import asyncio
-from sqlalchemy import select
+from sqlalchemy import select, update
+
+IMPORTANCE_ICONS = {
+    'critical': '🔴',
+    'high': '🟠',
+    'medium': '🟡',
+    'low': '⚪'
+}
 
 
 async def test_ultra_refined():
@@ -47,12 +55,7 @@ async def test_ultra_refined():
     print("=" * 70)
     
     for section in sections:
-        importance_icon = {
-            'critical': '🔴',
-            'high': '🟠',
-            'medium': '🟡',
-            'low': '⚪'
-        }.get(section['importance'], '⚪')
+        importance_icon = IMPORTANCE_ICONS.get(section['importance'], '⚪')
         
         print(f"\n{importance_icon} [{section['section_number']}] {section['title']}")
         print(f"   Importance: {section['importance'].upper()}")
@@ -84,24 +87,31 @@ async def test_ultra_refined():
         print(f"\n🔄 Updating database with ULTRA-REFINED HTML...")
         print(f"   Drug ID: {drug.id}\n")
         
-        updated = 0
+        # Prefetch this drug's sections once instead of a SELECT per section
+        existing_result = await session.execute(
+            select(DBDrugSection).where(DBDrugSection.drug_label_id == drug.id)
+        )
+        existing_sections = {
+            db_section.loinc_code: db_section
+            for db_section in existing_result.scalars().all()
+        }
+        
+        # Collect primary-key updates and send them as one executemany
+        # instead of letting the unit of work flush an UPDATE per object
+        updates = []
         for section in sections:
-            section_query = select(DBDrugSection).where(
-                DBDrugSection.drug_label_id == drug.id,
-                DBDrugSection.loinc_code == section['loinc_code']
-            )
-            section_result = await session.execute(section_query)
-            db_section = section_result.scalar_one_or_none()
+            db_section = existing_sections.get(section['loinc_code'])
             
             if db_section:
-                db_section.content = section['content']
-                updated += 1
-                importance_icon = {'critical': '🔴', 'high': '🟠', 'medium': '🟡', 'low': '⚪'}[section['importance']]
+                updates.append({'id': db_section.id, 'content': section['content']})
+                importance_icon = IMPORTANCE_ICONS.get(section['importance'], '⚪')
                 print(f"   {importance_icon} [{section['section_number']}] {section['title']}")
         
+        if updates:
+            await session.execute(update(DBDrugSection), updates)
         await session.commit()
         
-        print(f"\n✅ Successfully updated {updated} sections!\n")
+        print(f"\n✅ Successfully updated {len(updates)} sections!\n")
         print(f"🌐 View: http://localhost:3001/analysis/{drug.id}\n")
         print(f"💎 ULTRA-REFINED Features:")
         print(f"   ✓ Section numbering (1, 1.1, 1.2, etc.)")
@@ -115,4 +125,5 @@ async def test_ultra_refined():
 
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(test_ultra_refined())
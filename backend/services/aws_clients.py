@@ -0,0 +1,54 @@
+"""
+Shared AWS Clients
+One boto3 S3 client per credential set, so S3Client and the watchdog
+S3Uploader share a connection pool instead of each opening their own
+"""
+
+import functools
+from typing import Optional
+
+import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+
+# Sized for the watchdog uploader's 16-worker pool plus multipart transfer
+# threads; boto3's default of 10 logs "Connection pool is full" under load.
+# Adaptive retries back off exponentially and rate-limit the client on
+# throttling (503 SlowDown, RequestTimeout) instead of failing the call
+S3_CLIENT_CONFIG = Config(
+    max_pool_connections=50,
+    retries={'mode': 'adaptive', 'max_attempts': 10},
+    connect_timeout=5,
+    read_timeout=60,
+    # Keep pooled connections alive so back-to-back calls
+    # reuse the TLS session instead of re-handshaking
+    tcp_keepalive=True
+)
+
+# Larger parts and read buffers than boto3's defaults (8 MB parts, 256 KB
+# io_chunksize) cut per-part and per-read overhead on label ZIP transfers
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    multipart_chunksize=50 * 1024 * 1024,
+    max_concurrency=10,
+    use_threads=True,
+    io_chunksize=1024 * 1024
+)
+
+
+@functools.lru_cache(maxsize=None)
+def get_s3_client(
+    aws_access_key_id: Optional[str],
+    aws_secret_access_key: Optional[str],
+    region_name: Optional[str]
+):
+    """
+    Get or create the shared S3 client for these credentials
+    boto3 clients are thread-safe, so one instance serves every caller
+    """
+    session = boto3.session.Session(
+        aws_access_key_id=aws_access_key_id,
+        aws_secret_access_key=aws_secret_access_key,
+        region_name=region_name
+    )
+    return session.client('s3', config=S3_CLIENT_CONFIG)
@@ -19,6 +19,12 @@ load_dotenv(dotenv_path=env_path)
 class GitHubDispatcher:
     """Dispatches GitHub Actions workflows"""
     
+    # Cap on dispatch requests in flight at once
+    MAX_CONCURRENT_DISPATCHES = 10
+    
+    # Retries (with exponential backoff) when GitHub rate-limits a dispatch
+    RATE_LIMIT_RETRIES = 3
+    
     def __init__(self):
         self.github_token = os.getenv('GITHUB_TOKEN')
         self.repo_owner = os.getenv('GITHUB_REPO_OWNER', 'Nihith132')
@@ -27,6 +33,21 @@ class GitHubDispatcher:
         
         if not self.github_token:
             print("⚠️ WARNING: GITHUB_TOKEN not set - workflow dispatch will fail")
+        
+        # One long-lived client so dispatches share a single HTTP/2 connection
+        self._client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            headers={
+                'Authorization': f'Bearer {self.github_token}',
+                'Accept': 'application/vnd.github+json',
+                'X-GitHub-Api-Version': '2022-11-28'
+            }
+        )
+    
+    async def aclose(self):
+        """Close the underlying HTTP client"""
+        await self._client.aclose()
     
     async def trigger_workflow(
         self, 
@@ -56,12 +77,6 @@ class GitHubDispatcher:
         
         url = f"https://api.github.com/repos/{self.repo_owner}/{self.repo_name}/actions/workflows/{self.workflow_file}/dispatches"
         
-        headers = {
-            'Authorization': f'Bearer {self.github_token}',
-            'Accept': 'application/vnd.github+json',
-            'X-GitHub-Api-Version': '2022-11-28'
-        }
-        
         payload = {
             'ref': 'main',  # or your default branch
             'inputs': {
@@ -72,25 +87,25 @@ class GitHubDispatcher:
         }
         
         try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload, headers=headers)
-                
-                if response.status_code == 204:
-                    # Success - GitHub returns 204 No Content
-                    return {
-                        'status': 'success',
-                        'message': f'Workflow triggered successfully for {len(set_ids)} drug(s)',
-                        'set_ids': set_ids,
-                        'mode': mode,
-                        'workflow_url': f'https://github.com/{self.repo_owner}/{self.repo_name}/actions/workflows/{self.workflow_file}'
-                    }
-                else:
-                    error_detail = response.text
-                    return {
-                        'status': 'error',
-                        'message': f'GitHub API returned {response.status_code}',
-                        'detail': error_detail
-                    }
+            response = await self._client.post(url, json=payload)
+            
+            if response.status_code == 204:
+                # Success - GitHub returns 204 No Content
+                return {
+                    'status': 'success',
+                    'message': f'Workflow triggered successfully for {len(set_ids)} drug(s)',
+                    'set_ids': set_ids,
+                    'mode': mode,
+                    'workflow_url': f'https://github.com/{self.repo_owner}/{self.repo_name}/actions/workflows/{self.workflow_file}'
+                }
+            else:
+                error_detail = response.text
+                return {
+                    'status': 'error',
+                    'message': f'GitHub API returned {response.status_code}',
+                    'status_code': response.status_code,
+                    'detail': error_detail
+                }
         
         except Exception as e:
             return {
@@ -104,23 +119,51 @@ class GitHubDispatcher:
         force_download: bool = False
     ) -> List[dict]:
         """
-        Trigger workflow for multiple drugs (sequentially)
+        Trigger workflow for multiple drugs (concurrently)
         Each drug gets its own workflow run
         
         Returns:
-            List of result dicts
+            List of result dicts, in the same order as set_ids
         """
-        results = []
+        semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_DISPATCHES)
         
-        for set_id in set_ids:
-            result = await self.trigger_workflow(
-                set_ids=[set_id],
-                mode='manual',
-                force_download=force_download
-            )
-            results.append(result)
-            
-            # Small delay between triggers to avoid rate limiting
-            await asyncio.sleep(1)
+        async def trigger_one(set_id: str) -> dict:
+            async with semaphore:
+                for attempt in range(self.RATE_LIMIT_RETRIES + 1):
+                    result = await self.trigger_workflow(
+                        set_ids=[set_id],
+                        mode='manual',
+                        force_download=force_download
+                    )
+                    # Back off only when GitHub actually rate-limits us
+                    if result.get('status_code') != 429 or attempt == self.RATE_LIMIT_RETRIES:
+                        return result
+                    await asyncio.sleep(2 ** attempt)
         
-        return results
+        return list(await asyncio.gather(*(trigger_one(set_id) for set_id in set_ids)))
+
+
+# Global instance (singleton pattern)
+_github_dispatcher = None
+
+
+def get_github_dispatcher() -> GitHubDispatcher:
+    """
+    Get or create the shared dispatcher for the API process
+    Singleton so every request reuses one GitHub API connection
+    """
+    global _github_dispatcher
+    
+    if _github_dispatcher is None:
+        _github_dispatcher = GitHubDispatcher()
+    
+    return _github_dispatcher
+
+
+async def close_github_dispatcher():
+    """Close the shared dispatcher's HTTP client, if one was created"""
+    global _github_dispatcher
+    
+    if _github_dispatcher is not None:
+        await _github_dispatcher.aclose()
+        _github_dispatcher = None
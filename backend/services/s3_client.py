@@ -3,14 +3,19 @@ AWS S3 Client Service
 Handles all interactions with S3 bucket for raw FDA label storage
 """
 
-import boto3
 from botocore.exceptions import ClientError, NoCredentialsError
-from typing import List, Optional, BinaryIO
+from collections import OrderedDict
+from typing import Iterator, List, Optional, BinaryIO
 import io
 import logging
+import mmap
+import os
+import threading
+import time
 from pathlib import Path
 
 from backend.core.config import settings
+from .aws_clients import TRANSFER_CONFIG, get_s3_client
 
 logger = logging.getLogger(__name__)
 
@@ -21,21 +26,59 @@ class S3Client:
     Handles upload, download, listing, and versioning
     """
     
+    # HeadObject results are cached per key so repeat lookups during a run
+    # skip the request; writes through this client invalidate their key
+    METADATA_CACHE_SIZE = 1024
+    METADATA_CACHE_TTL = 60.0
+    
+    # Files above this size are uploaded from a read-only memory map
+    MMAP_UPLOAD_THRESHOLD = 32 * 1024 * 1024
+    
     def __init__(self):
         """Initialize S3 client with credentials from settings"""
         try:
-            self.s3_client = boto3.client(
-                's3',
+            self.s3_client = get_s3_client(
                 aws_access_key_id=settings.AWS_ACCESS_KEY_ID,
                 aws_secret_access_key=settings.AWS_SECRET_ACCESS_KEY,
                 region_name=settings.AWS_REGION
             )
             self.bucket_name = settings.S3_BUCKET_NAME
+            self._metadata_cache = OrderedDict()
+            self._metadata_cache_lock = threading.Lock()
             logger.info(f"S3 Client initialized for bucket: {self.bucket_name}")
         except NoCredentialsError:
             logger.error("AWS credentials not found. Check your .env file.")
             raise
     
+    def _head_object(self, s3_key: str) -> dict:
+        """
+        HeadObject through the metadata cache
+        Only found objects are cached; raises ClientError like head_object
+        """
+        now = time.monotonic()
+        with self._metadata_cache_lock:
+            cached = self._metadata_cache.get(s3_key)
+            if cached and cached[0] > now:
+                self._metadata_cache.move_to_end(s3_key)
+                return cached[1]
+        
+        response = self.s3_client.head_object(
+            Bucket=self.bucket_name,
+            Key=s3_key
+        )
+        
+        with self._metadata_cache_lock:
+            self._metadata_cache[s3_key] = (now + self.METADATA_CACHE_TTL, response)
+            self._metadata_cache.move_to_end(s3_key)
+            if len(self._metadata_cache) > self.METADATA_CACHE_SIZE:
+                self._metadata_cache.popitem(last=False)
+        return response
+    
+    def _invalidate_metadata(self, s3_key: str):
+        """Drop a key from the metadata cache after writing or deleting it"""
+        with self._metadata_cache_lock:
+            self._metadata_cache.pop(s3_key, None)
+    
     def bucket_exists(self) -> bool:
         """Check if the configured bucket exists"""
         try:
@@ -93,12 +136,27 @@ class S3Client:
             if metadata:
                 extra_args['Metadata'] = metadata
             
-            self.s3_client.upload_file(
-                file_path,
-                self.bucket_name,
-                s3_key,
-                ExtraArgs=extra_args
-            )
+            if os.path.getsize(file_path) > self.MMAP_UPLOAD_THRESHOLD:
+                # Parts are sliced out of the page cache through the map
+                # instead of being read into Python buffers chunk by chunk
+                with open(file_path, 'rb') as f, \
+                        mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    self.s3_client.upload_fileobj(
+                        mm,
+                        self.bucket_name,
+                        s3_key,
+                        ExtraArgs=extra_args,
+                        Config=TRANSFER_CONFIG
+                    )
+            else:
+                self.s3_client.upload_file(
+                    file_path,
+                    self.bucket_name,
+                    s3_key,
+                    ExtraArgs=extra_args,
+                    Config=TRANSFER_CONFIG
+                )
+            self._invalidate_metadata(s3_key)
             logger.info(f"Uploaded {file_path} to s3://{self.bucket_name}/{s3_key}")
             return True
         except FileNotFoundError:
@@ -131,8 +189,10 @@ class S3Client:
                 file_obj,
                 self.bucket_name,
                 s3_key,
-                ExtraArgs=extra_args
+                ExtraArgs=extra_args,
+                Config=TRANSFER_CONFIG
             )
+            self._invalidate_metadata(s3_key)
             logger.info(f"Uploaded file object to s3://{self.bucket_name}/{s3_key}")
             return True
         except ClientError as e:
@@ -154,7 +214,8 @@ class S3Client:
             self.s3_client.download_file(
                 self.bucket_name,
                 s3_key,
-                local_path
+                local_path,
+                Config=TRANSFER_CONFIG
             )
             logger.info(f"Downloaded s3://{self.bucket_name}/{s3_key} to {local_path}")
             return True
@@ -178,7 +239,8 @@ class S3Client:
             self.s3_client.download_fileobj(
                 self.bucket_name,
                 s3_key,
-                file_obj
+                file_obj,
+                Config=TRANSFER_CONFIG
             )
             file_obj.seek(0)  # Reset pointer to beginning
             logger.info(f"Downloaded s3://{self.bucket_name}/{s3_key} to memory")
@@ -187,9 +249,34 @@ class S3Client:
             logger.error(f"Failed to download file to memory: {e}")
             return None
     
+    def iter_objects(self, prefix: str = "") -> Iterator[dict]:
+        """
+        Lazily yield objects in bucket with optional prefix filter
+        Pages through list_objects_v2, so only one page is held in memory
+        and callers see the first keys before the listing finishes
+        
+        Args:
+            prefix: Filter by key prefix (e.g., "ozempic/" for all Ozempic files)
+        
+        Yields:
+            Dicts with 'key', 'size', 'last_modified'
+        
+        Raises:
+            ClientError: If a page request fails
+        """
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                yield {
+                    'key': obj['Key'],
+                    'size': obj['Size'],
+                    'last_modified': obj['LastModified']
+                }
+    
     def list_objects(self, prefix: str = "") -> List[dict]:
         """
         List all objects in bucket with optional prefix filter
+        Prefer iter_objects() for large prefixes
         
         Args:
             prefix: Filter by key prefix (e.g., "ozempic/" for all Ozempic files)
@@ -198,22 +285,7 @@ class S3Client:
             List of dicts with 'Key', 'Size', 'LastModified'
         """
         try:
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix
-            )
-            
-            if 'Contents' not in response:
-                return []
-            
-            objects = [
-                {
-                    'key': obj['Key'],
-                    'size': obj['Size'],
-                    'last_modified': obj['LastModified']
-                }
-                for obj in response['Contents']
-            ]
+            objects = list(self.iter_objects(prefix))
             logger.info(f"Found {len(objects)} objects with prefix '{prefix}'")
             return objects
         except ClientError as e:
@@ -233,6 +305,7 @@ class S3Client:
                 Bucket=self.bucket_name,
                 Key=s3_key
             )
+            self._invalidate_metadata(s3_key)
             logger.warning(f"Deleted s3://{self.bucket_name}/{s3_key}")
             return True
         except ClientError as e:
@@ -242,6 +315,7 @@ class S3Client:
     def get_object_metadata(self, s3_key: str) -> Optional[dict]:
         """
         Get metadata for an S3 object without downloading it
+        Served from the metadata cache for up to METADATA_CACHE_TTL seconds
         
         Args:
             s3_key: S3 object key
@@ -250,10 +324,7 @@ class S3Client:
             Dict with metadata or None if not found
         """
         try:
-            response = self.s3_client.head_object(
-                Bucket=self.bucket_name,
-                Key=s3_key
-            )
+            response = self._head_object(s3_key)
             return {
                 'size': response['ContentLength'],
                 'last_modified': response['LastModified'],
@@ -268,8 +339,18 @@ class S3Client:
             return None
     
     def object_exists(self, s3_key: str) -> bool:
-        """Check if an object exists in S3"""
-        return self.get_object_metadata(s3_key) is not None
+        """
+        Check if an object exists in S3
+        Uses a bare HEAD request (shared with get_object_metadata's cache);
+        call get_object_metadata() for the fields
+        """
+        try:
+            self._head_object(s3_key)
+            return True
+        except ClientError as e:
+            if e.response['Error']['Code'] not in ('404', 'NoSuchKey'):
+                logger.error(f"Failed to check object existence: {e}")
+            return False
 
 
 # Singleton instance
@@ -3,7 +3,10 @@ Notifier Service
 Sends alerts via Slack and Email
 """
 
+import asyncio
+import gzip
 import httpx
+import orjson
 import os
 from typing import List, Dict
 from datetime import datetime
@@ -16,7 +19,10 @@ class Notifier:
         self.slack_webhook = os.getenv('SLACK_WEBHOOK_URL')
         self.sendgrid_api_key = os.getenv('SENDGRID_API_KEY')
         self.notification_emails = os.getenv('NOTIFICATION_EMAILS', '').split(',')
-        self.http_client = httpx.AsyncClient(timeout=10.0)
+        self.http_client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(10.0, connect=5.0)
+        )
     
     async def send_summary(
         self,
@@ -39,39 +45,32 @@ class Notifier:
         
         if new_versions:
             message_blocks.append(f"🆕 *{len(new_versions)} New Version(s) Detected:*")
-            for v in new_versions:
-                message_blocks.append(
-                    f"   • {v['drug_name']}\n"
-                    f"      {v['current_version']} → {v['new_version']}\n"
-                    f"      Published: {v.get('publish_date', 'Unknown')}"
-                )
+            message_blocks.extend(
+                f"   • {v['drug_name']}\n"
+                f"      {v['current_version']} → {v['new_version']}\n"
+                f"      Published: {v.get('publish_date', 'Unknown')}"
+                for v in new_versions
+            )
             message_blocks.append("")
         
         if up_to_date:
-            message_blocks.append(f"✅ *{len(up_to_date)} Drug(s) Up to Date*")
-            message_blocks.append("")
+            message_blocks.extend((f"✅ *{len(up_to_date)} Drug(s) Up to Date*", ""))
         
         if errors:
             message_blocks.append(f"❌ *{len(errors)} Error(s):*")
-            for e in errors:
-                message_blocks.append(
-                    f"   • {e.get('drug_name', e.get('set_id', 'Unknown'))}\n"
-                    f"      Error: {e.get('error', 'Unknown error')}"
-                )
+            message_blocks.extend(
+                f"   • {e.get('drug_name', e.get('set_id', 'Unknown'))}\n"
+                f"      Error: {e.get('error', 'Unknown error')}"
+                for e in errors
+            )
             message_blocks.append("")
         
         message_text = "\n".join(message_blocks)
         
-        # Send to Slack
-        if self.slack_webhook:
-            await self._send_slack(message_text)
-        
-        # Send to Email
-        if self.sendgrid_api_key and self.notification_emails:
-            await self._send_email(
-                subject=f"Watchdog Report: {len(new_versions)} New Version(s)",
-                body=message_text
-            )
+        await self._dispatch(
+            subject=f"Watchdog Report: {len(new_versions)} New Version(s)",
+            message=message_text
+        )
     
     async def send_error(
         self,
@@ -84,25 +83,33 @@ class Notifier:
         """
         timestamp = datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S UTC')
         
+        set_id_line = f"SET_ID: {set_id}\n" if set_id else ""
         message = (
             f"🚨 *Watchdog Pipeline FAILED*\n"
             f"_Time: {timestamp} | Mode: {mode.upper()}_\n\n"
             f"**Error:**\n{error_message}\n\n"
+            f"{set_id_line}"
         )
         
-        if set_id:
-            message += f"SET_ID: {set_id}\n"
+        await self._dispatch(
+            subject="🚨 Watchdog Pipeline FAILED",
+            message=message
+        )
+    
+    async def _dispatch(self, subject: str, message: str):
+        """Send to every configured channel concurrently"""
+        sends = []
         
         # Send to Slack
         if self.slack_webhook:
-            await self._send_slack(message)
+            sends.append(self._send_slack(message))
         
         # Send to Email
         if self.sendgrid_api_key and self.notification_emails:
-            await self._send_email(
-                subject="🚨 Watchdog Pipeline FAILED",
-                body=message
-            )
+            sends.append(self._send_email(subject=subject, body=message))
+        
+        # Each sender handles and reports its own errors
+        await asyncio.gather(*sends)
     
     async def _send_slack(self, message: str):
         """Send message to Slack webhook"""
@@ -115,7 +122,8 @@ class Notifier:
             
             response = await self.http_client.post(
                 self.slack_webhook,
-                json=payload
+                headers={"Content-Type": "application/json"},
+                content=orjson.dumps(payload)
             )
             
             if response.status_code == 200:
@@ -134,7 +142,8 @@ class Notifier:
             
             headers = {
                 "Authorization": f"Bearer {self.sendgrid_api_key}",
-                "Content-Type": "application/json"
+                "Content-Type": "application/json",
+                "Content-Encoding": "gzip"
             }
             
             payload = {
@@ -156,10 +165,11 @@ class Notifier:
                 ]
             }
             
+            # SendGrid accepts gzip-compressed request bodies
             response = await self.http_client.post(
                 url,
                 headers=headers,
-                json=payload
+                content=gzip.compress(orjson.dumps(payload))
             )
             
             if response.status_code == 202:
@@ -3,19 +3,40 @@ S3 Uploader Service
 Handles uploading label ZIPs to AWS S3
 """
 
-import boto3
+import asyncio
+import functools
+import hashlib
+import heapq
+import mmap
 import os
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Optional
+from typing import AsyncIterator, Optional
+
+from ..aws_clients import TRANSFER_CONFIG, get_s3_client
+
+# Streamed uploads buffer this much before sending a part (S3's minimum
+# part size is 5 MB); most label ZIPs fit in one part and skip multipart
+STREAM_PART_SIZE = 16 * 1024 * 1024
+
+
+def sha256_of(path: Path) -> str:
+    """Hash a file through a read-only memory map (no userspace read copy)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        # mmap can't map an empty file
+        if os.fstat(f.fileno()).st_size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                digest.update(mm)
+    return digest.hexdigest()
 
 
 class S3Uploader:
     """Uploads label files to S3 with organized folder structure"""
     
     def __init__(self):
-        self.s3_client = boto3.client(
-            's3',
+        self.s3_client = get_s3_client(
             aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
             aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
             region_name=os.getenv('AWS_REGION', 'us-east-1')
@@ -24,6 +45,17 @@ class S3Uploader:
         
         if not self.bucket_name:
             raise ValueError("S3_BUCKET_NAME environment variable not set")
+        
+        # boto3 is blocking; run its calls here so they don't stall the
+        # event loop (the client is thread-safe and shared across workers)
+        self._executor = ThreadPoolExecutor(max_workers=16)
+    
+    async def _run(self, func, *args, **kwargs):
+        """Run a blocking call on the uploader's thread pool"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(func, *args, **kwargs)
+        )
     
     async def upload_label(
         self,
@@ -37,15 +69,30 @@ class S3Uploader:
         
         Folder structure: labels/active/{set_id}/v{version}/{set_id}_v{version}.zip
         
+        Skips the upload if an identical file (same SHA-256) is already
+        stored for this version
+        
         Returns S3 key if successful, None otherwise
         """
         try:
+            digest = await self._run(sha256_of, zip_path)
+            
+            existing_key = await self._run(
+                self._find_existing_upload,
+                prefix=f"labels/active/{set_id}/v{version}/",
+                digest=digest
+            )
+            if existing_key:
+                print(f"         Unchanged file already in S3, skipping upload")
+                return existing_key
+            
             # Construct S3 key
             timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
             s3_key = f"labels/active/{set_id}/v{version}/{set_id}_v{version}_{timestamp}.zip"
             
             # Upload with metadata
-            self.s3_client.upload_file(
+            await self._run(
+                self.s3_client.upload_file,
                 str(zip_path),
                 self.bucket_name,
                 s3_key,
@@ -54,17 +101,162 @@ class S3Uploader:
                         'drug_id': str(drug_id),
                         'set_id': set_id,
                         'version': version,
-                        'upload_date': timestamp
+                        'upload_date': timestamp,
+                        'sha256': digest
                     }
-                }
+                },
+                Config=TRANSFER_CONFIG
+            )
+            
+            return s3_key
+        
+        except Exception as e:
+            print(f"         S3 upload error: {str(e)}")
+            return None
+    
+    async def upload_label_stream(
+        self,
+        chunks: AsyncIterator[bytes],
+        drug_id: int,
+        set_id: str,
+        version: str
+    ) -> Optional[str]:
+        """
+        Upload label ZIP to S3 as it streams in, without a temp file
+        
+        Same key layout and metadata as upload_label. Bodies that fit in
+        one part get the SHA-256 dedup check and a single put_object;
+        larger ones are forwarded part by part through a multipart upload,
+        overlapping each part's upload with the download of the next (the
+        digest isn't known until the end, so those skip dedup and carry no
+        sha256 metadata)
+        
+        Returns S3 key if successful, None otherwise
+        """
+        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        s3_key = f"labels/active/{set_id}/v{version}/{set_id}_v{version}_{timestamp}.zip"
+        metadata = {
+            'drug_id': str(drug_id),
+            'set_id': set_id,
+            'version': version,
+            'upload_date': timestamp
+        }
+        
+        digest = hashlib.sha256()
+        buffer = bytearray()
+        upload_id = None
+        parts = []
+        in_flight = None
+        
+        try:
+            async for chunk in chunks:
+                digest.update(chunk)
+                buffer += chunk
+                if len(buffer) < STREAM_PART_SIZE:
+                    continue
+                
+                if upload_id is None:
+                    response = await self._run(
+                        self.s3_client.create_multipart_upload,
+                        Bucket=self.bucket_name,
+                        Key=s3_key,
+                        Metadata=metadata
+                    )
+                    upload_id = response['UploadId']
+                
+                # At most one part uploading while the next one downloads
+                if in_flight:
+                    parts.append(await in_flight)
+                in_flight = asyncio.ensure_future(self._run(
+                    self._upload_part, s3_key, upload_id, len(parts) + 1, bytes(buffer)
+                ))
+                buffer.clear()
+            
+            if upload_id is None:
+                sha256 = digest.hexdigest()
+                existing_key = await self._run(
+                    self._find_existing_upload,
+                    prefix=f"labels/active/{set_id}/v{version}/",
+                    digest=sha256
+                )
+                if existing_key:
+                    print(f"         Unchanged file already in S3, skipping upload")
+                    return existing_key
+                
+                await self._run(
+                    self.s3_client.put_object,
+                    Bucket=self.bucket_name,
+                    Key=s3_key,
+                    Body=bytes(buffer),
+                    Metadata={**metadata, 'sha256': sha256}
+                )
+                return s3_key
+            
+            parts.append(await in_flight)
+            in_flight = None
+            if buffer:
+                # The last part may be smaller than the 5 MB minimum
+                parts.append(await self._run(
+                    self._upload_part, s3_key, upload_id, len(parts) + 1, bytes(buffer)
+                ))
+            
+            await self._run(
+                self.s3_client.complete_multipart_upload,
+                Bucket=self.bucket_name,
+                Key=s3_key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
             )
             
             return s3_key
         
         except Exception as e:
             print(f"         S3 upload error: {str(e)}")
+            if upload_id:
+                # Let a running part finish first, or it outlives the abort
+                if in_flight:
+                    await asyncio.gather(in_flight, return_exceptions=True)
+                try:
+                    await self._run(
+                        self.s3_client.abort_multipart_upload,
+                        Bucket=self.bucket_name,
+                        Key=s3_key,
+                        UploadId=upload_id
+                    )
+                except Exception as abort_error:
+                    print(f"         Multipart abort error: {str(abort_error)}")
             return None
     
+    def _upload_part(self, s3_key: str, upload_id: str, part_number: int, body: bytes) -> dict:
+        """Upload one multipart part and return its entry for completion"""
+        response = self.s3_client.upload_part(
+            Bucket=self.bucket_name,
+            Key=s3_key,
+            UploadId=upload_id,
+            PartNumber=part_number,
+            Body=body
+        )
+        return {'PartNumber': part_number, 'ETag': response['ETag']}
+    
+    def _iter_objects(self, prefix: str):
+        """Yield every object under prefix, following list_objects_v2 pagination"""
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(
+            Bucket=self.bucket_name,
+            Prefix=prefix,
+            PaginationConfig={'PageSize': 1000}
+        ):
+            yield from page.get('Contents', [])
+    
+    def _find_existing_upload(self, prefix: str, digest: str) -> Optional[str]:
+        """Return the key of an object under prefix whose sha256 metadata matches"""
+        for obj in self._iter_objects(prefix):
+            head = self.s3_client.head_object(Bucket=self.bucket_name, Key=obj['Key'])
+            if head.get('Metadata', {}).get('sha256') == digest:
+                return obj['Key']
+        
+        return None
+    
     async def archive_old_version(
         self,
         set_id: str,
@@ -78,40 +270,64 @@ class S3Uploader:
         try:
             # List all versions for this SET_ID
             prefix = f"labels/active/{set_id}/"
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                Prefix=prefix
-            )
+            objects = await self._run(lambda: list(self._iter_objects(prefix)))
             
-            if 'Contents' not in response:
+            # Keep the 5 most recent; a bounded heap avoids a full sort
+            keep = {
+                obj['Key']
+                for obj in heapq.nlargest(5, objects, key=lambda x: x['LastModified'])
+            }
+            
+            # Archive versions beyond the 5 most recent
+            moves = [
+                (obj['Key'], obj['Key'].replace('labels/active/', 'labels/archive/'))
+                for obj in objects
+                if obj['Key'] not in keep
+            ]
+            if not moves:
                 return
             
-            # Sort by version (newest first)
-            objects = sorted(
-                response['Contents'],
-                key=lambda x: x['LastModified'],
-                reverse=True
+            # Server-side copies in parallel on the shared pool
+            copy_results = await asyncio.gather(
+                *(
+                    self._run(
+                        self.s3_client.copy_object,
+                        Bucket=self.bucket_name,
+                        CopySource={'Bucket': self.bucket_name, 'Key': old_key},
+                        Key=new_key
+                    )
+                    for old_key, new_key in moves
+                ),
+                return_exceptions=True
             )
             
-            # Archive versions beyond the 5 most recent
-            for obj in objects[5:]:
-                old_key = obj['Key']
-                new_key = old_key.replace('labels/active/', 'labels/archive/')
-                
-                # Copy to archive
-                self.s3_client.copy_object(
-                    Bucket=self.bucket_name,
-                    CopySource={'Bucket': self.bucket_name, 'Key': old_key},
-                    Key=new_key
-                )
-                
-                # Delete from active
-                self.s3_client.delete_object(
+            # Only remove originals whose archive copy succeeded
+            archived = []
+            for (old_key, new_key), copy_result in zip(moves, copy_results):
+                if isinstance(copy_result, Exception):
+                    print(f"         Archive copy failed for {old_key}: {copy_result}")
+                else:
+                    archived.append((old_key, new_key))
+            
+            # Delete from active in bulk (DeleteObjects takes up to 1000 keys)
+            failed_deletes = set()
+            for start in range(0, len(archived), 1000):
+                batch = archived[start:start + 1000]
+                response = await self._run(
+                    self.s3_client.delete_objects,
                     Bucket=self.bucket_name,
-                    Key=old_key
+                    Delete={
+                        'Objects': [{'Key': old_key} for old_key, _ in batch],
+                        'Quiet': True
+                    }
                 )
-                
-                print(f"         Archived: {old_key} → {new_key}")
+                for error in response.get('Errors', []):
+                    failed_deletes.add(error['Key'])
+                    print(f"         Archive delete failed for {error['Key']}: {error.get('Message')}")
+            
+            for old_key, new_key in archived:
+                if old_key not in failed_deletes:
+                    print(f"         Archived: {old_key} → {new_key}")
         
         except Exception as e:
             print(f"         Archive error: {str(e)}")
@@ -130,10 +346,12 @@ class S3Uploader:
             date_prefix = datetime.utcnow().strftime('%Y%m%d')
             s3_key = f"logs/watchdog/{date_prefix}/watchdog_{run_timestamp}.log"
             
-            self.s3_client.upload_file(
+            await self._run(
+                self.s3_client.upload_file,
                 str(log_path),
                 self.bucket_name,
-                s3_key
+                s3_key,
+                Config=TRANSFER_CONFIG
             )
             
             return s3_key
@@ -141,3 +359,7 @@ class S3Uploader:
         except Exception as e:
             print(f"         Log upload error: {str(e)}")
             return None
+    
+    async def close(self):
+        """Shut down the worker pool"""
+        self._executor.shutdown(wait=False)
@@ -4,84 +4,275 @@ Interfaces with DailyMed API to check label versions
 """
 
 import httpx
+import orjson
 import asyncio
+import hashlib
+import logging
 from datetime import datetime
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Tuple
 from sqlalchemy import text
 from pathlib import Path
-import zipfile
+import os
+import random
 import tempfile
+import time
+
+logger = logging.getLogger(__name__)
+
+
+# Statements are built once at import rather than on every call
+_DRUG_COLUMNS = """
+    id as drug_id,
+    set_id,
+    name as drug_name,
+    version as current_version,
+    dailymed_etag as etag,
+    dailymed_last_modified as last_modified
+"""
+
+_GET_ENABLED_DRUGS = text(f"""
+    SELECT {_DRUG_COLUMNS}
+    FROM drug_labels
+    WHERE version_check_enabled = true
+    ORDER BY name
+""")
+
+_GET_SPECIFIC_DRUG = text(f"""
+    SELECT {_DRUG_COLUMNS}
+    FROM drug_labels
+    WHERE set_id = :set_id
+""")
+
+# Bump the drug's version and record the history row in one round trip;
+# select-list parameters are cast because Postgres can't infer their types,
+# and the history version gets its own parameter so it isn't typed by
+# drug_labels.version
+_SAVE_VERSION_UPDATE = text("""
+    WITH updated AS (
+        UPDATE drug_labels
+        SET version = :new_version,
+            last_version_check = :now,
+            dailymed_etag = :etag,
+            dailymed_last_modified = :last_modified
+        WHERE id = :drug_id
+        RETURNING id
+    )
+    INSERT INTO drug_version_history (
+        drug_id, old_version, new_version, s3_key, 
+        publish_date, detected_at
+    )
+    SELECT
+        id,
+        CAST(:old_version AS VARCHAR),
+        CAST(:history_new_version AS VARCHAR),
+        CAST(:s3_key AS VARCHAR),
+        CAST(:publish_date AS VARCHAR),
+        CAST(:now AS TIMESTAMP)
+    FROM updated
+""")
+
+# Local file header signature every non-empty ZIP starts with
+ZIP_MAGIC = b"PK\x03\x04"
+
+# End of central directory record that closes every complete ZIP; it is
+# 22 bytes plus a comment of up to 64 KB, so it sits within this many
+# bytes of the end
+ZIP_EOCD_MAGIC = b"PK\x05\x06"
+ZIP_EOCD_SEARCH_SIZE = 22 + 0xFFFF
+
+_UPDATE_VALIDATORS = text("""
+    UPDATE drug_labels
+    SET dailymed_etag = :etag,
+        dailymed_last_modified = :last_modified,
+        last_version_check = :now
+    WHERE id = :drug_id
+""")
+
+def _store_by_content(part_path: Path, digest: str, link_path: Path) -> Path:
+    """
+    Move a finished download to {sha256}.zip, reusing an identical file if
+    one is already there, and point link_path at it
+    
+    Returns link_path, or the content-addressed file if symlinks aren't
+    supported
+    """
+    final_path = part_path.with_name(f"{digest}.zip")
+    if final_path.exists():
+        part_path.unlink()
+    else:
+        os.replace(part_path, final_path)
+    
+    try:
+        if link_path.is_symlink() or link_path.exists():
+            link_path.unlink()
+        link_path.symlink_to(final_path.name)
+        return link_path
+    except OSError:
+        return final_path
+
+
+# DailyMed history responses shared by every VersionChecker in the process:
+# set_id -> (fetched_at, data, etag, last_modified)
+_HISTORY_CACHE: Dict[str, Tuple[float, Dict, Optional[str], Optional[str]]] = {}
 
 
 class VersionChecker:
     """Checks DailyMed API for label version updates"""
     
     DAILYMED_API_BASE = "https://dailymed.nlm.nih.gov/dailymed/services/v2"
+    MAX_RETRIES = 4
     
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+    # Repeat checks of a set_id within the policy's TTL (seconds) reuse the
+    # cached history instead of calling DailyMed: manual checks from the UI
+    # want near-real-time data, while labels change over days, so
+    # scheduled sweeps can reuse a history for an hour
+    HISTORY_CACHE_TTLS = {
+        'short': 10.0,
+        'normal': 60.0,
+        'long': 3600.0
+    }
+    
+    # When DailyMed fails, cached history up to this old is served instead
+    STALE_CACHE_TTL = 24 * 60 * 60.0
+    
+    def __init__(self, cache_policy: str = 'normal'):
+        self.cache_policy = cache_policy
+        
+        # HTTP/2 lets the concurrent version checks multiplex over one
+        # connection; the pool is sized for check_versions_bulk's fan-out
+        # (16 checks plus streaming downloads), all kept alive for reuse
+        self.client = httpx.AsyncClient(
+            http2=True,
+            timeout=httpx.Timeout(30.0, connect=5.0),
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=32,
+                keepalive_expiry=60.0
+            ),
+            # JSON history payloads compress well; httpx decodes brotli
+            # through the brotli extra
+            headers={
+                "Accept-Encoding": "br, gzip",
+                "User-Agent": "glp1-watchdog/1.0"
+            }
+        )
+    
+    async def _get(self, url: str, headers: Dict) -> httpx.Response:
+        """
+        GET with exponential backoff on transport errors, 429 and 5xx
+        responses; delays are jittered so a throttled bulk check doesn't
+        retry all at once
+        """
+        for attempt in range(self.MAX_RETRIES + 1):
+            try:
+                response = await self.client.get(url, headers=headers)
+                retryable = response.status_code == 429 or response.status_code >= 500
+                if not retryable or attempt == self.MAX_RETRIES:
+                    return response
+            except httpx.TransportError:
+                if attempt == self.MAX_RETRIES:
+                    raise
+            delay = min(2 ** attempt, 30)
+            await asyncio.sleep(delay / 2 + random.uniform(0, delay / 2))
     
     async def get_enabled_drugs(self, session) -> List[Dict]:
         """
         Get all drugs with version_check_enabled=true
         
-        Returns list of dicts with drug_id, set_id, drug_name, current_version
+        Returns list of read-only row mappings with drug_id, set_id,
+        drug_name, current_version
         """
-        query = text("""
-            SELECT 
-                id as drug_id,
-                set_id,
-                name as drug_name,
-                version as current_version
-            FROM drug_labels
-            WHERE version_check_enabled = true
-            ORDER BY name
-        """)
-        
-        result = await session.execute(query)
-        return [dict(row._mapping) for row in result.fetchall()]
+        result = await session.execute(_GET_ENABLED_DRUGS)
+        return result.mappings().all()
     
     async def get_specific_drug(self, session, set_id: str) -> List[Dict]:
         """Get specific drug by SET_ID for manual checks"""
-        query = text("""
-            SELECT 
-                id as drug_id,
-                set_id,
-                name as drug_name,
-                version as current_version
-            FROM drug_labels
-            WHERE set_id = :set_id
-        """)
-        
-        result = await session.execute(query, {"set_id": set_id})
-        rows = result.fetchall()
-        return [dict(row._mapping) for row in rows]
+        result = await session.execute(_GET_SPECIFIC_DRUG, {"set_id": set_id})
+        return result.mappings().all()
     
     async def check_version(
         self, 
         drug_id: int, 
         set_id: str, 
-        current_version: Optional[str]
+        current_version: Optional[str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        drug_name: Optional[str] = None,
+        cache_policy: Optional[str] = None
     ) -> Dict:
         """
         Check if new version exists on DailyMed
         
-        Returns dict with status: 'new_version', 'up_to_date', or 'error'
+        Pass the validators saved from the last up-to-date check (etag,
+        last_modified) to make a conditional request; a 304 means the
+        history is unchanged and skips downloading and decoding it. A set_id
+        checked within the cache policy's TTL (cache_policy, defaulting to
+        the checker's) is answered from the in-process history cache
+        without calling DailyMed; if DailyMed is down, cached
+        history up to STALE_CACHE_TTL old is used and the result has
+        'stale': True
+        
+        Returns dict with status: 'new_version', 'up_to_date', or 'error';
+        results built from a history also carry its 'etag' and 'last_modified'
         """
         try:
-            # Get version history from DailyMed
-            url = f"{self.DAILYMED_API_BASE}/spls/{set_id}/history.json"
-            response = await self.client.get(url)
-            
-            if response.status_code != 200:
-                return {
-                    'status': 'error',
-                    'drug_id': drug_id,
-                    'set_id': set_id,
-                    'error': f"DailyMed API returned {response.status_code}"
-                }
-            
-            data = response.json()
+            stale = False
+            now = time.monotonic()
+            cached = _HISTORY_CACHE.get(set_id)
+            cache_ttl = self.HISTORY_CACHE_TTLS[cache_policy or self.cache_policy]
+            if cached and now - cached[0] < cache_ttl:
+                _, data, etag, last_modified = cached
+            else:
+                # Get version history from DailyMed
+                url = f"{self.DAILYMED_API_BASE}/spls/{set_id}/history.json"
+                
+                headers = {}
+                if etag:
+                    headers['If-None-Match'] = etag
+                if last_modified:
+                    headers['If-Modified-Since'] = last_modified
+                
+                try:
+                    response = await self._get(url, headers)
+                    failure = f"DailyMed API returned {response.status_code}"
+                except httpx.TransportError as e:
+                    response = None
+                    failure = f"DailyMed unreachable: {str(e)}"
+                
+                if response is not None and response.status_code == 304:
+                    return {
+                        'status': 'up_to_date',
+                        'drug_id': drug_id,
+                        'set_id': set_id,
+                        'drug_name': drug_name or 'Unknown',
+                        'current_version': str(current_version) if current_version else None,
+                        'etag': etag,
+                        'last_modified': last_modified
+                    }
+                
+                if response is not None and response.status_code == 200:
+                    # orjson decodes the raw bytes directly, skipping the str
+                    # decode and the slower stdlib parser in the fan-out
+                    data = orjson.loads(response.content)
+                    etag = response.headers.get('etag')
+                    last_modified = response.headers.get('last-modified')
+                    _HISTORY_CACHE[set_id] = (now, data, etag, last_modified)
+                elif (
+                    (response is None or response.status_code >= 500)
+                    and cached and now - cached[0] < self.STALE_CACHE_TTL
+                ):
+                    # Fall back to the last good history during outages
+                    # rather than reporting every drug as an error
+                    logger.warning("%s, using cached history for %s", failure, set_id)
+                    _, data, etag, last_modified = cached
+                    stale = True
+                else:
+                    return {
+                        'status': 'error',
+                        'drug_id': drug_id,
+                        'set_id': set_id,
+                        'error': failure
+                    }
             
             # Extract latest version from history array
             history = data.get('data', {}).get('history', [])
@@ -121,7 +312,10 @@ class VersionChecker:
                     'drug_name': drug_name,
                     'current_version': current_version_str,
                     'new_version': new_version,
-                    'publish_date': publish_date
+                    'publish_date': publish_date,
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'stale': stale
                 }
             else:
                 return {
@@ -129,7 +323,10 @@ class VersionChecker:
                     'drug_id': drug_id,
                     'set_id': set_id,
                     'drug_name': drug_name,
-                    'current_version': current_version_str
+                    'current_version': current_version_str,
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'stale': stale
                 }
         
         except Exception as e:
@@ -140,6 +337,35 @@ class VersionChecker:
                 'error': str(e)
             }
     
+    async def check_versions_bulk(
+        self,
+        drugs: List[Dict],
+        concurrency: int = 16
+    ) -> List[Dict]:
+        """
+        Check many drugs concurrently over the shared HTTP client
+        
+        Args:
+            drugs: Dicts with drug_id, set_id, current_version
+            concurrency: Max DailyMed requests in flight at once
+        
+        Returns list of check_version results, in the same order as drugs
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def check_one(drug: Dict) -> Dict:
+            async with semaphore:
+                return await self.check_version(
+                    drug_id=drug['drug_id'],
+                    set_id=drug['set_id'],
+                    current_version=drug['current_version'],
+                    etag=drug.get('etag'),
+                    last_modified=drug.get('last_modified'),
+                    drug_name=drug.get('drug_name')
+                )
+        
+        return list(await asyncio.gather(*(check_one(drug) for drug in drugs)))
+    
     async def download_label_zip(
         self, 
         set_id: str, 
@@ -148,45 +374,176 @@ class VersionChecker:
         """
         Download label ZIP from DailyMed
         
-        Returns path to downloaded ZIP file in temp directory
+        Returns path to downloaded ZIP file in temp directory; set
+        WATCHDOG_TMPDIR (e.g. /dev/shm/watchdog_downloads) to keep the
+        short-lived ZIPs on a RAM-backed filesystem
         """
         try:
             # DailyMed direct ZIP download endpoint
             url = f"https://dailymed.nlm.nih.gov/dailymed/downloadzipfile.cfm?setId={set_id}"
             
-            print(f"         Downloading from: {url}")
-            response = await self.client.get(url, follow_redirects=True)
+            logger.debug("Downloading from: %s", url)
             
-            if response.status_code != 200:
-                print(f"         Error: HTTP {response.status_code}")
-                return None
+            temp_dir = Path(
+                os.getenv('WATCHDOG_TMPDIR')
+                or Path(tempfile.gettempdir()) / "watchdog_downloads"
+            )
+            await asyncio.to_thread(temp_dir.mkdir, parents=True, exist_ok=True)
             
-            # Check if response is actually a ZIP file
-            content_type = response.headers.get('content-type', '').lower()
-            if 'html' in content_type:
-                print(f"         Error: Got HTML instead of ZIP file")
-                return None
+            zip_path = temp_dir / f"{set_id}_v{version}.zip"
             
-            # Save to temp file
-            temp_dir = Path(tempfile.gettempdir()) / "watchdog_downloads"
-            temp_dir.mkdir(exist_ok=True)
+            # Written under a temporary name, then stored by content hash so
+            # identical ZIPs (e.g. shared by generic variants) are kept once
+            part_path = temp_dir / f"{set_id}_v{version}.zip.part"
+            digest = hashlib.sha256()
             
-            zip_path = temp_dir / f"{set_id}_v{version}.zip"
-            zip_path.write_bytes(response.content)
+            # Stream the body to disk in 1 MB chunks instead of buffering
+            # the whole ZIP in memory first
+            async with self.client.stream("GET", url, follow_redirects=True) as response:
+                if response.status_code != 200:
+                    logger.warning("ZIP download for %s returned HTTP %d", set_id, response.status_code)
+                    return None
+                
+                # Check if response is actually a ZIP file
+                content_type = response.headers.get('content-type', '').lower()
+                if 'html' in content_type:
+                    logger.warning("ZIP download for %s returned HTML instead of a ZIP file", set_id)
+                    return None
+                
+                is_zip = False
+                tail = b""
+                with open(part_path, 'wb') as f:
+                    async for chunk in response.aiter_bytes(1024 * 1024):
+                        # Verify it's a ZIP from the first bytes and stop
+                        # early instead of downloading a bad body
+                        if not is_zip:
+                            if not chunk.startswith(ZIP_MAGIC):
+                                break
+                            is_zip = True
+                        
+                        # Keep the end of the body to find the EOCD record
+                        tail = (tail + chunk[-ZIP_EOCD_SEARCH_SIZE:])[-ZIP_EOCD_SEARCH_SIZE:]
+                        digest.update(chunk)
+                        
+                        # Keep disk writes off the event loop
+                        await asyncio.to_thread(f.write, chunk)
+            
+            if not is_zip:
+                logger.warning("Downloaded file for %s is not a valid ZIP", set_id)
+                await asyncio.to_thread(part_path.unlink)
+                return None
             
-            # Verify it's a valid ZIP
-            if not zipfile.is_zipfile(zip_path):
-                print(f"         Error: Downloaded file is not a valid ZIP")
-                zip_path.unlink()
+            if ZIP_EOCD_MAGIC not in tail:
+                logger.warning("Downloaded ZIP for %s is truncated", set_id)
+                await asyncio.to_thread(part_path.unlink)
                 return None
             
-            print(f"         ✓ Downloaded successfully: {zip_path}")
+            zip_path = await asyncio.to_thread(
+                _store_by_content, part_path, digest.hexdigest(), zip_path
+            )
+            
+            logger.debug("Downloaded successfully: %s", zip_path)
             return zip_path
         
         except Exception as e:
-            print(f"         Download error: {str(e)}")
+            logger.warning("Download error for %s: %s", set_id, e)
             return None
     
+    async def fetch_and_upload(
+        self,
+        s3_uploader,
+        drug_id: int,
+        set_id: str,
+        version: str
+    ) -> Optional[str]:
+        """
+        Stream label ZIP from DailyMed straight into S3
+        
+        Forwards the body to S3Uploader.upload_label_stream as it arrives,
+        so nothing touches local disk and the upload overlaps the download
+        
+        Returns S3 key if successful, None otherwise
+        """
+        try:
+            url = f"https://dailymed.nlm.nih.gov/dailymed/downloadzipfile.cfm?setId={set_id}"
+            
+            logger.debug("Downloading from: %s", url)
+            
+            async with self.client.stream("GET", url, follow_redirects=True) as response:
+                if response.status_code != 200:
+                    logger.warning("ZIP download for %s returned HTTP %d", set_id, response.status_code)
+                    return None
+                
+                # Check if response is actually a ZIP file
+                content_type = response.headers.get('content-type', '').lower()
+                if 'html' in content_type:
+                    logger.warning("ZIP download for %s returned HTML instead of a ZIP file", set_id)
+                    return None
+                
+                return await s3_uploader.upload_label_stream(
+                    self._iter_zip_chunks(response),
+                    drug_id=drug_id,
+                    set_id=set_id,
+                    version=version
+                )
+        
+        except Exception as e:
+            logger.warning("Download error for %s: %s", set_id, e)
+            return None
+    
+    async def fetch_and_upload_bulk(
+        self,
+        s3_uploader,
+        new_versions: List[Dict],
+        concurrency: int = 4
+    ) -> List[Optional[str]]:
+        """
+        Stream several new label versions into S3 concurrently
+        
+        Args:
+            new_versions: 'new_version' results from check_version
+            concurrency: Max ZIP transfers in flight at once (each buffers
+                up to two 16 MB parts)
+        
+        Returns list of S3 keys (None on failure), in the same order
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+        
+        async def fetch_one(result: Dict) -> Optional[str]:
+            async with semaphore:
+                return await self.fetch_and_upload(
+                    s3_uploader,
+                    drug_id=result['drug_id'],
+                    set_id=result['set_id'],
+                    version=result['new_version']
+                )
+        
+        return list(await asyncio.gather(*(fetch_one(result) for result in new_versions)))
+    
+    @staticmethod
+    async def _iter_zip_chunks(response):
+        """
+        Yield the response body, validating it as a ZIP in flight
+        
+        Fails on the first chunk if it isn't a ZIP, and after the last one
+        if the body has no EOCD record (truncated), so no second pass over
+        the file is needed
+        """
+        checked = False
+        tail = b""
+        async for chunk in response.aiter_bytes(8 * 1024 * 1024):
+            if not checked:
+                if not chunk.startswith(ZIP_MAGIC):
+                    raise ValueError("Downloaded file is not a valid ZIP")
+                checked = True
+            tail = (tail + chunk[-ZIP_EOCD_SEARCH_SIZE:])[-ZIP_EOCD_SEARCH_SIZE:]
+            yield chunk
+        
+        if not checked:
+            raise ValueError("Downloaded file is empty")
+        if ZIP_EOCD_MAGIC not in tail:
+            raise ValueError("Downloaded ZIP is truncated")
+    
     async def save_version_update(
         self,
         session,
@@ -194,45 +551,29 @@ class VersionChecker:
         old_version: Optional[str],
         new_version: str,
         s3_key: str,
-        publish_date: Optional[str]
+        publish_date: Optional[str],
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None
     ):
         """
         Save version update to database
         
-        Updates drug_labels.version and inserts into drug_version_history
+        Updates drug_labels.version (and DailyMed validators) and inserts
+        into drug_version_history
         """
         try:
-            # Update current version in drug_labels table
-            update_drug = text("""
-                UPDATE drug_labels
-                SET version = :new_version,
-                    last_version_check = :now
-                WHERE id = :drug_id
-            """)
-            await session.execute(update_drug, {
-                "new_version": str(new_version),  # Ensure string type
-                "now": datetime.utcnow(),
-                "drug_id": drug_id
-            })
-            
-            # Insert version history record
-            insert_history = text("""
-                INSERT INTO drug_version_history (
-                    drug_id, old_version, new_version, s3_key, 
-                    publish_date, detected_at
-                )
-                VALUES (
-                    :drug_id, :old_version, :new_version, :s3_key,
-                    :publish_date, :detected_at
-                )
-            """)
-            await session.execute(insert_history, {
+            # Update current version in drug_labels table and insert
+            # the version history record
+            await session.execute(_SAVE_VERSION_UPDATE, {
                 "drug_id": drug_id,
                 "old_version": str(old_version) if old_version else None,
-                "new_version": str(new_version),
+                "new_version": str(new_version),  # Ensure string type
+                "history_new_version": str(new_version),
                 "s3_key": s3_key,
                 "publish_date": publish_date,
-                "detected_at": datetime.utcnow()
+                "etag": etag,
+                "last_modified": last_modified,
+                "now": datetime.utcnow()
             })
             
             await session.commit()
@@ -241,6 +582,92 @@ class VersionChecker:
             await session.rollback()
             raise Exception(f"Database update failed: {str(e)}")
     
+    async def save_version_updates_bulk(self, session, updates: List[Dict]):
+        """
+        Save many version updates in one transaction
+        
+        Args:
+            updates: Dicts with the save_version_update arguments (drug_id,
+                old_version, new_version, s3_key, publish_date, and
+                optionally etag, last_modified)
+        """
+        if not updates:
+            return
+        
+        now = datetime.utcnow()
+        params = [
+            {
+                "drug_id": update['drug_id'],
+                "old_version": str(update['old_version']) if update.get('old_version') else None,
+                "new_version": str(update['new_version']),  # Ensure string type
+                "history_new_version": str(update['new_version']),
+                "s3_key": update['s3_key'],
+                "publish_date": update.get('publish_date'),
+                "etag": update.get('etag'),
+                "last_modified": update.get('last_modified'),
+                "now": now
+            }
+            for update in updates
+        ]
+        
+        try:
+            # executemany: one statement, one commit for the whole run
+            await session.execute(_SAVE_VERSION_UPDATE, params)
+            await session.commit()
+        
+        except Exception as e:
+            await session.rollback()
+            raise Exception(f"Database update failed: {str(e)}")
+    
+    async def save_validators(self, session, results: List[Dict]):
+        """
+        Record DailyMed validators and check time for up-to-date drugs
+        
+        Only call with up-to-date results: storing the validators of a new
+        version before it is processed would make the next check return 304
+        and hide the update
+        """
+        params = [
+            {
+                "etag": result.get('etag'),
+                "last_modified": result.get('last_modified'),
+                "now": datetime.utcnow(),
+                "drug_id": result['drug_id']
+            }
+            for result in results
+        ]
+        if not params:
+            return
+        
+        await session.execute(_UPDATE_VALIDATORS, params)
+        await session.commit()
+    
     async def close(self):
         """Close HTTP client"""
         await self.client.aclose()
+
+
+# Global instance (singleton pattern)
+_version_checker = None
+
+
+def get_version_checker() -> VersionChecker:
+    """
+    Get or create the shared version checker for the API process
+    Singleton so every request reuses one DailyMed connection pool
+    """
+    global _version_checker
+    
+    if _version_checker is None:
+        _version_checker = VersionChecker()
+    
+    return _version_checker
+
+
+async def close_version_checker():
+    """Close the shared version checker's HTTP client, if one was created"""
+    global _version_checker
+    
+    if _version_checker is not None:
+        await _version_checker.close()
+        _version_checker = None